@@ -112,18 +112,13 @@ export default function Home() {
 
     try {
       // Use Python backend with GPT-4 Vision to identify book from image
-      const reader = new FileReader()
-      const imageDataUrl = await new Promise<string>((resolve) => {
-        reader.onload = () => resolve(reader.result as string)
-        reader.readAsDataURL(selectedFile)
-      })
+      // (raw multipart upload avoids the base64 data URL round-trip)
+      const formData = new FormData()
+      formData.append('image', selectedFile)
 
-      const response = await fetch(getApiUrl('identify-book'), {
+      const response = await fetch(getApiUrl('identify-book-raw'), {
         method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({ image: imageDataUrl }),
+        body: formData,
       })
 
       if (!response.ok) {
@@ -5,90 +5,217 @@ Handles book identification and browser automation.
 """
 
 import asyncio
+import atexit
 import base64
-import json
+import concurrent.futures
+import contextlib
+import fnmatch
+import functools
+import hashlib
+import logging
+import logging.handlers
 import os
+import queue
+import selectors
+import shutil
+import subprocess
 import sys
+import threading
+import uuid
 from datetime import datetime
-from urllib.parse import quote
 from io import BytesIO
+from urllib.parse import quote
 import tempfile
 import requests
+import httpx
+import orjson
+from cachetools import LRUCache
 
 from flask import Flask, request, jsonify, send_from_directory
+from flask.json.provider import JSONProvider
+from flask_compress import Compress
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit
+from werkzeug.utils import secure_filename
 from dotenv import load_dotenv
+import PIL
+from PIL import Image, ImageOps
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
 import openai
-from openai import OpenAI
-from PIL import Image
+from openai import AsyncOpenAI
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_random_exponential
+try:
+    import redis
+except ImportError:
+    redis = None
+try:
+    import numpy as np
+    from turbojpeg import TurboJPEG, TJPF_RGB
+    turbo_jpeg = TurboJPEG()
+except (ImportError, OSError, RuntimeError):
+    # PyTurboJPEG missing or libturbojpeg not found; covers go through PIL
+    turbo_jpeg = None
 # PyPDF2 import removed - no longer using PDF extraction
 
 # Load environment variables
 load_dotenv()
 
+# Log through a queue so the blocking stdout writes happen on the listener thread;
+# records are still formatted in the calling thread (set LOG_LEVEL=DEBUG for verbose output)
+log_queue = queue.SimpleQueue()
+log_handler = logging.StreamHandler(sys.stdout)
+log_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+log_listener = logging.handlers.QueueListener(log_queue, log_handler)
+log_listener.start()
+atexit.register(log_listener.stop)
+
+logger = logging.getLogger('bookfetcher')
+logger.setLevel(os.getenv('LOG_LEVEL', 'INFO').upper())
+logger.addHandler(logging.handlers.QueueHandler(log_queue))
+logger.propagate = False
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson, used by jsonify and request.get_json."""
+
+    OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=self.OPTIONS).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Skip the bytes -> str -> bytes round-trip of the default implementation
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj, option=self.OPTIONS), mimetype='application/json')
+
+class OrjsonSocketIOJson:
+    """json-module stand-in so Socket.IO packets are encoded with orjson too."""
+
+    @staticmethod
+    def dumps(obj, *args, **kwargs):
+        # python-socketio passes stdlib options like separators=; orjson output is already compact
+        return orjson.dumps(obj, option=OrjsonProvider.OPTIONS).decode('utf-8')
+
+    @staticmethod
+    def loads(s, *args, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 app.config['SECRET_KEY'] = 'bookfetcher_secret_key'
+# Negotiate brotli/gzip from Accept-Encoding for text responses (JSON, HTML, JS, CSS);
+# JPEG/PNG screenshots are already compressed and are served as-is
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIMETYPES'] = ['application/json', 'text/html', 'text/css', 'text/javascript', 'application/javascript']
+app.config['COMPRESS_MIN_SIZE'] = 500
+Compress(app)
 CORS(app, origins=["http://localhost:3000"])
 socketio = SocketIO(
     app, 
     cors_allowed_origins="http://localhost:3000",
     async_mode='threading',
-    logger=True,
-    engineio_logger=True
+    json=OrjsonSocketIOJson,
+    logger=logger,
+    engineio_logger=logger
+)
+
+# Shared event loop for async OpenAI calls, driven by a daemon thread so the
+# sync Flask/Socket.IO handlers can submit coroutines to it
+async_loop = asyncio.new_event_loop()
+# Short asyncio.to_thread work on that loop (file I/O, image hashing, progress delivery) gets a
+# small dedicated pool instead of the default cpu_count() + 4 threads. Long waits stay out of it:
+# OpenAI calls use async clients, EasyOCR has its own thread and tesseract its own process pool
+async_io_pool = concurrent.futures.ThreadPoolExecutor(
+    max_workers=min(8, (os.cpu_count() or 1) + 2),
+    thread_name_prefix='bookio'
+)
+async_loop.set_default_executor(async_io_pool)
+atexit.register(async_io_pool.shutdown, wait=False)
+threading.Thread(target=async_loop.run_forever, name='bookfetcher-async', daemon=True).start()
+
+def run_async(coro):
+    """Run a coroutine on the shared event loop and wait for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, async_loop).result()
+
+# Initialize OpenAI client with one pooled HTTP client so keep-alive
+# connections (and their TLS sessions) are reused across requests
+http_client = httpx.AsyncClient(
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+)
+async_client = AsyncOpenAI(
+    api_key=os.getenv('OPENAI_API_KEY', ''),
+    http_client=http_client,
+    timeout=60.0,
+    max_retries=0
 )
 
-# Initialize OpenAI client
-openai.api_key = os.getenv('OPENAI_API_KEY')
+# Back off and retry GPT-4 calls on rate limits, dropped connections and 5xx
+# instead of surfacing them to the user as a failed request
+retry_openai = retry(
+    retry=retry_if_exception_type((openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)),
+    wait=wait_random_exponential(multiplier=1, max=30),
+    stop=stop_after_attempt(5),
+    reraise=True
+)
+
+# Optional Redis cache for GPT-4 results (enabled when REDIS_URL is set)
+CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+redis_url = os.getenv('REDIS_URL')
+cache = redis.Redis.from_url(redis_url) if redis and redis_url else None
+
+def cache_get(key: str):
+    """Return the cached JSON value for key, or None on miss or cache failure."""
+    if cache is None:
+        return None
+    try:
+        cached = cache.get(key)
+        return orjson.loads(cached) if cached else None
+    except Exception as e:
+        logger.warning(f"⚠️ Cache read failed for {key}: {e}")
+        return None
+
+def cache_set(key: str, value):
+    """Store a JSON-serializable value under key with the default TTL."""
+    if cache is None:
+        return
+    try:
+        cache.set(key, orjson.dumps(value), ex=CACHE_TTL_SECONDS)
+    except Exception as e:
+        logger.warning(f"⚠️ Cache write failed for {key}: {e}")
+
+def cover_cache_key(image_bytes: bytes) -> str:
+    return f"cover:{hashlib.blake2b(image_bytes, digest_size=16).hexdigest()}"
+
+def facts_cache_key(title: str, author: str) -> str:
+    book_id = f"{title.strip().lower()}\0{author.strip().lower()}".encode('utf-8')
+    return f"facts:{hashlib.blake2b(book_id, digest_size=16).hexdigest()}"
+
+@atexit.register
+def close_http_client():
+    """Close pooled OpenAI connections on interpreter shutdown."""
+    if async_loop.is_running():
+        asyncio.run_coroutine_threadsafe(http_client.aclose(), async_loop).result(timeout=5)
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
     return jsonify({"status": "healthy", "timestamp": datetime.now().isoformat()})
 
+SCREENSHOTS_DIR = os.path.join('temp', 'screenshots')
+
 @app.route('/screenshot/<filename>')
 def serve_screenshot(filename):
     """Serve screenshot images from the temp/screenshots directory"""
     try:
-        screenshots_dir = os.path.join('temp', 'screenshots')
-        return send_from_directory(screenshots_dir, filename)
+        return send_from_directory(SCREENSHOTS_DIR, filename, conditional=True)
     except Exception as e:
-        print(f"❌ Error serving screenshot {filename}: {e}")
+        logger.error(f"❌ Error serving screenshot {filename}: {e}")
         return jsonify({'error': 'Screenshot not found'}), 404
 
-@app.route('/identify-book', methods=['POST'])
-def identify_book():
-    """Identify book from uploaded cover image using GPT-4 Vision."""
-    try:
-        data = request.get_json()
-        
-        if not data or 'image' not in data:
-            return jsonify({"error": "No image provided"}), 400
-            
-        # Extract base64 image data
-        image_data = data['image']
-        if image_data.startswith('data:image'):
-            # Remove data:image/jpeg;base64, prefix
-            image_data = image_data.split(',')[1]
-        
-        # Validate image
-        try:
-            image_bytes = base64.b64decode(image_data)
-            image = Image.open(BytesIO(image_bytes))
-            print(f"📖 Image loaded: {image.size}, format: {image.format}")
-        except Exception as e:
-            return jsonify({"error": f"Invalid image data: {str(e)}"}), 400
-        
-        # Call GPT-4 Vision API
-        response = openai.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": """First, carefully examine this image to determine if it shows a clear book cover.
+IDENTIFY_PROMPT = """First, carefully examine this image to determine if it shows a clear book cover.
 
 VALIDATION CRITERIA:
 - Must show a book cover (front of a book)
@@ -112,62 +239,287 @@ If this IS a clear book cover, extract the book information and return:
                             }
                             
 Return ONLY the JSON object, nothing else."""
-                        },
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/jpeg;base64,{image_data}"
-                            }
-                        }
-                    ]
-                }
-            ],
-            max_tokens=300,
-            temperature=0.1
-        )
+
+# One short GPT-4 call per fact, so the facts come back in parallel
+FACT_CATEGORIES = [
+    ("✍️", "a fascinating behind-the-scenes detail about the writing process"),
+    ("🌍", "an interesting real-world inspiration or influence"),
+    ("🏆", "a notable award, record, or sales milestone"),
+    ("🎲", "a piece of fun trivia readers would find entertaining"),
+    ("🎭", "something memorable about its characters"),
+    ("🌟", "its cultural impact or legacy"),
+]
+
+def build_fact_prompt(subject: str, focus: str) -> str:
+    """Build the prompt for a single fun fact about a book description like '"Dune" by Frank Herbert'."""
+    return f"""Share one interesting and engaging fun fact about {subject}: {focus}.
+
+Return a JSON object with "icon" (single emoji) and "text" fields.
+Keep the fact concise but engaging (1-2 sentences max).
+
+Example format:
+{{"icon": "✍️", "text": "The author wrote this while traveling across 12 countries."}}"""
+
+def fallback_facts(title: str, author: str, genre: str) -> list:
+    """Generic facts used when GPT-4 output can't be parsed."""
+    return [
+        {"icon": "📚", "text": f"'{title}' is a beloved {genre.lower()} novel by {author}."},
+        {"icon": "✨", "text": "This book has captivated readers around the world with its compelling narrative."},
+        {"icon": "🎭", "text": "The story features complex characters and intricate plot development."},
+        {"icon": "🌟", "text": "Critics and readers alike have praised this work for its literary merit."}
+    ]
+
+# Leading bytes of the image formats GPT-4 Vision accepts
+IMAGE_MAGIC_NUMBERS = (b'\xff\xd8\xff', b'\x89PNG', b'GIF8')
+
+def is_supported_image(image_bytes: bytes) -> bool:
+    """Cheap format check on the file signature instead of a full image decode."""
+    if image_bytes.startswith(IMAGE_MAGIC_NUMBERS):
+        return True
+    return image_bytes[:4] == b'RIFF' and image_bytes[8:12] == b'WEBP'
+
+# GPT-4 Vision gains nothing from larger covers, it only bills more tiles
+MAX_COVER_DIMENSION = 1024
+
+# EXIF Orientation tag value -> transpose that turns the decoded pixels upright
+EXIF_ORIENTATION_TAG = 0x0112
+EXIF_ORIENTATION_TRANSPOSE = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
+
+def turbo_scaling_factor(width: int, height: int):
+    """Smallest libjpeg-turbo DCT scaling factor that keeps the cover >= MAX_COVER_DIMENSION."""
+    longest = max(width, height)
+    usable = [
+        (num, den) for num, den in turbo_jpeg.scaling_factors
+        if num <= den and longest * num / den >= MAX_COVER_DIMENSION
+    ]
+    return min(usable, key=lambda factor: factor[0] / factor[1], default=(1, 1))
+
+def downscale_jpeg_turbo(image_bytes: bytes):
+    """Decode a JPEG at reduced DCT scale, resize and re-encode it with libjpeg-turbo."""
+    width, height, _, _ = turbo_jpeg.decode_header(image_bytes)
+    if max(width, height) <= MAX_COVER_DIMENSION:
+        return None
+    # Let the decoder skip most of the IDCT work instead of decoding full size
+    pixels = turbo_jpeg.decode(
+        image_bytes,
+        pixel_format=TJPF_RGB,
+        scaling_factor=turbo_scaling_factor(width, height)
+    )
+    img = Image.fromarray(pixels)
+    # turbo_jpeg.decode ignores EXIF, and re-encoding drops the Orientation tag,
+    # so rotate phone photos upright before they lose it
+    with Image.open(BytesIO(image_bytes)) as original:
+        transpose = EXIF_ORIENTATION_TRANSPOSE.get(original.getexif().get(EXIF_ORIENTATION_TAG))
+    if transpose is not None:
+        img = img.transpose(transpose)
+    img.thumbnail((MAX_COVER_DIMENSION, MAX_COVER_DIMENSION), Image.LANCZOS)
+    return turbo_jpeg.encode(np.asarray(img), quality=85, pixel_format=TJPF_RGB)
+
+def downscale_cover(image_bytes: bytes, image_data: str) -> str:
+    """Return the base64 cover to send to GPT-4, re-encoded as a <=1024 px JPEG if larger."""
+    try:
+        if turbo_jpeg is not None and image_bytes.startswith(b'\xff\xd8\xff'):
+            encoded = downscale_jpeg_turbo(image_bytes)
+            if encoded is None:
+                return image_data
+            logger.info(f"🗜️ Cover downscaled with libjpeg-turbo ({len(image_bytes)} -> {len(encoded)} bytes)")
+            return base64.b64encode(encoded).decode('ascii')
         
-        # Parse GPT-4 response
-        gpt_response = response.choices[0].message.content.strip()
-        print(f"🤖 GPT-4 response: {gpt_response}")
+        img = Image.open(BytesIO(image_bytes))
+        if max(img.size) <= MAX_COVER_DIMENSION:
+            return image_data
+        original_size = img.size
+        # Re-encoding drops the EXIF Orientation tag, so bake the rotation into the pixels
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((MAX_COVER_DIMENSION, MAX_COVER_DIMENSION), Image.LANCZOS)
+        buf = BytesIO()
+        img.convert('RGB').save(buf, 'JPEG', quality=85, optimize=False)
+        logger.info(f"🗜️ Cover downscaled from {original_size} to {img.size} ({len(image_bytes)} -> {buf.tell()} bytes)")
+        return base64.b64encode(buf.getvalue()).decode('ascii')
+    except Exception as e:
+        logger.warning(f"⚠️ Could not downscale cover, sending original: {e}")
+        return image_data
+
+def extract_image_data(data) -> str:
+    """Return the base64 payload of the 'image' field, without any data URL prefix."""
+    image_data = data['image']
+    if image_data.startswith('data:image'):
+        # Remove data:image/jpeg;base64, prefix
+        image_data = image_data.partition(',')[2]
+    return image_data
+
+NOT_A_COVER_MESSAGE = "This doesn't appear to be a clear book cover. Please retake the photo with a clear view of the book's front cover."
+
+@retry_openai
+async def identify_cover(image_data: str):
+    """Ask GPT-4 Vision to validate and identify a cover. Returns (payload, status_code)."""
+    stream = await async_client.chat.completions.create(
+        model="gpt-4o",
+        messages=[
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": IDENTIFY_PROMPT
+                    },
+                    {
+                        "type": "image_url",
+                        "image_url": {
+                            "url": f"data:image/jpeg;base64,{image_data}"
+                        }
+                    }
+                ]
+            }
+        ],
+        max_tokens=300,
+        temperature=0.1,
+        response_format={"type": "json_object"},
+        stream=True
+    )
+    
+    # Accumulate the streamed response; a rejection is only a short error/message
+    # object, so read it to the end and return GPT's own message like any other reply
+    gpt_response = ''
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            gpt_response += chunk.choices[0].delta.content
+    
+    # JSON mode guarantees a parseable object
+    logger.debug("🤖 GPT-4 response: %s", gpt_response)
+    book_info = orjson.loads(gpt_response)
+    
+    # Check if GPT-4 determined this is not a book cover
+    if book_info.get('error') == 'not_a_book_cover':
+        logger.error(f"❌ GPT-4 validation failed: {book_info.get('message', 'Not a clear book cover')}")
+        return {
+            "error": book_info.get('message', NOT_A_COVER_MESSAGE)
+        }, 400
+    
+    # Validate required fields for valid book covers
+    required_fields = ['title', 'author', 'genre', 'description']
+    for field in required_fields:
+        if field not in book_info:
+            book_info[field] = "Unknown"
+    
+    logger.info(f"✅ Book identified: {book_info['title']} by {book_info['author']}")
+    return book_info, 200
+
+@retry_openai
+async def generate_fact(subject: str, icon: str, focus: str, image_data: str = None) -> dict:
+    """Ask GPT-4 for one fun fact in the given category. Raises if the reply is unparseable."""
+    content = build_fact_prompt(subject, focus)
+    if image_data:
+        content = [
+            {"type": "text", "text": content},
+            {
+                "type": "image_url",
+                "image_url": {"url": f"data:image/jpeg;base64,{image_data}", "detail": "low"}
+            }
+        ]
+    
+    response = await async_client.chat.completions.create(
+        model="gpt-4o",
+        messages=[
+            {
+                "role": "user",
+                "content": content
+            }
+        ],
+        max_tokens=120,
+        temperature=0.3,
+        response_format={"type": "json_object"}
+    )
+    
+    fact = orjson.loads(response.choices[0].message.content)
+    return {"icon": fact.get("icon") or icon, "text": fact["text"]}
+
+async def generate_facts(subject: str, image_data: str = None):
+    """Ask GPT-4 for fun facts about a book, one concurrent call per category.
+
+    Returns the facts that came back, or None if every call failed. When image_data
+    is given the book is described by its cover instead of by title, so facts can be
+    requested before identification finishes.
+    """
+    results = await asyncio.gather(
+        *(generate_fact(subject, icon, focus, image_data) for icon, focus in FACT_CATEGORIES),
+        return_exceptions=True
+    )
+    
+    facts = [result for result in results if not isinstance(result, BaseException)]
+    failures = len(results) - len(facts)
+    if failures:
+        logger.warning(f"⚠️ {failures} of {len(results)} fact requests failed")
+    logger.info(f"📝 Generated {len(facts)} facts")
+    return facts or None
+
+def identify_cover_response(image_bytes: bytes, image_data: str):
+    """Validate a decoded cover and identify it (cache first, then GPT-4 Vision)."""
+    # Validate image
+    if not is_supported_image(image_bytes):
+        return jsonify({"error": "Invalid image data: expected a JPEG, PNG, GIF or WebP image"}), 400
+    logger.info(f"📖 Image received: {len(image_bytes)} bytes")
+    
+    cover_key = cover_cache_key(image_bytes)
+    cached = cache_get(cover_key)
+    if cached:
+        logger.info(f"⚡ Cache hit for {cover_key}")
+        return jsonify(cached)
+    
+    # Call GPT-4 Vision API
+    book_info, status = run_async(identify_cover(downscale_cover(image_bytes, image_data)))
+    if status == 200:
+        cache_set(cover_key, book_info)
+    return jsonify(book_info), status
+
+@app.route('/identify-book', methods=['POST'])
+def identify_book():
+    """Identify book from uploaded cover image using GPT-4 Vision."""
+    try:
+        data = request.get_json()
         
-        # Try to parse as JSON (handle markdown-wrapped JSON)
+        if not data or 'image' not in data:
+            return jsonify({"error": "No image provided"}), 400
+            
+        # Extract base64 image data
+        image_data = extract_image_data(data)
         try:
-            # Remove markdown wrapper if present
-            if gpt_response.startswith('```json'):
-                gpt_response = gpt_response.replace('```json', '').replace('```', '').strip()
-            elif gpt_response.startswith('```'):
-                gpt_response = gpt_response.replace('```', '').strip()
-            
-            book_info = json.loads(gpt_response)
-            
-            # Check if GPT-4 determined this is not a book cover
-            if 'error' in book_info and book_info['error'] == 'not_a_book_cover':
-                print(f"❌ GPT-4 validation failed: {book_info.get('message', 'Not a clear book cover')}")
-                return jsonify({
-                    "error": book_info.get('message', 'This doesn\'t appear to be a clear book cover. Please retake the photo with a clear view of the book\'s front cover.')
-                }), 400
-            
-            # Validate required fields for valid book covers
-            required_fields = ['title', 'author', 'genre', 'description']
-            for field in required_fields:
-                if field not in book_info:
-                    book_info[field] = "Unknown"
-            
-            print(f"✅ Book identified: {book_info['title']} by {book_info['author']}")
-            return jsonify(book_info)
-            
-        except json.JSONDecodeError:
-            # If JSON parsing fails, try to extract info manually
-            print("⚠️ JSON parsing failed, attempting manual extraction")
-            return jsonify({
-                "title": "Unknown Title",
-                "author": "Unknown Author", 
-                "genre": "Unknown",
-                "description": gpt_response[:200]
-            })
+            image_bytes = base64.b64decode(image_data)
+        except Exception as e:
+            return jsonify({"error": f"Invalid image data: {str(e)}"}), 400
+        
+        return identify_cover_response(image_bytes, image_data)
         
     except Exception as e:
-        print(f"❌ Error identifying book: {str(e)}")
+        logger.error(f"❌ Error identifying book: {str(e)}")
+        return jsonify({"error": f"Failed to identify book: {str(e)}"}), 500
+
+@app.route('/identify-book-raw', methods=['POST'])
+def identify_book_raw():
+    """Identify book from a raw cover upload (multipart 'image' field or octet-stream body)."""
+    try:
+        if 'image' in request.files:
+            image_bytes = request.files['image'].read()
+        else:
+            image_bytes = request.get_data(cache=False)
+        
+        if not image_bytes:
+            return jsonify({"error": "No image provided"}), 400
+        
+        # GPT-4 Vision still needs base64, but it's encoded exactly once here
+        image_data = base64.b64encode(image_bytes).decode('ascii')
+        return identify_cover_response(image_bytes, image_data)
+        
+    except Exception as e:
+        logger.error(f"❌ Error identifying book: {str(e)}")
         return jsonify({"error": f"Failed to identify book: {str(e)}"}), 500
 
 @app.route('/generate-book-facts', methods=['POST'])
@@ -182,70 +534,76 @@ def generate_book_facts():
         if not title or not author:
             return jsonify({'error': 'Title and author are required'}), 400
             
-        print(f"📚 Generating fun facts for: {title} by {author}")
+        facts_key = facts_cache_key(title, author)
+        facts = cache_get(facts_key)
+        if facts:
+            logger.info(f"⚡ Cache hit for facts: {title} by {author}")
+        else:
+            logger.info(f"📚 Generating fun facts for: {title} by {author}")
+            facts = run_async(generate_facts(f'the book "{title}" by {author}'))
+            if facts is None:
+                facts = fallback_facts(title, author, genre)
+            elif len(facts) == len(FACT_CATEGORIES):
+                # Only cache complete sets so a partial failure is retried next time
+                cache_set(facts_key, facts)
         
-        response = openai.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {
-                    "role": "user",
-                    "content": f"""Generate 6 interesting and engaging fun facts about the book "{title}" by {author}. 
-
-Focus on:
-- Fascinating behind-the-scenes details about the writing process
-- Interesting real-world inspirations or influences  
-- Notable awards, records, or cultural impact
-- Fun trivia that readers would find entertaining
-- Unique aspects that make this book special
-
-Return as a JSON array of objects with "icon" (single emoji) and "text" fields.
-Keep each fact concise but engaging (1-2 sentences max).
+        return jsonify({
+            'success': True,
+            'facts': facts
+        })
+        
+    except Exception as e:
+        logger.error(f"❌ Error generating book facts: {e}")
+        return jsonify({'error': f'Failed to generate facts: {str(e)}'}), 500
 
-Example format:
-[
-  {{"icon": "✍️", "text": "The author wrote this while traveling across 12 countries."}},
-  {{"icon": "🏆", "text": "Won the Hugo Award and sold over 10 million copies worldwide."}}
-]"""
-                }
-            ],
-            max_tokens=800,
-            temperature=0.3
-        )
+@app.route('/identify-and-facts', methods=['POST'])
+def identify_and_facts():
+    """Identify a book cover and generate its fun facts with concurrent GPT-4 calls."""
+    try:
+        data = request.get_json()
         
-        content = response.choices[0].message.content.strip()
-        print(f"📝 Generated facts: {content[:200]}...")
+        if not data or 'image' not in data:
+            return jsonify({"error": "No image provided"}), 400
+        
+        image_data = extract_image_data(data)
         
-        # Parse JSON response
         try:
-            # Remove markdown wrapper if present
-            if content.startswith('```json'):
-                content = content.replace('```json', '').replace('```', '').strip()
-            elif content.startswith('```'):
-                content = content.replace('```', '').strip()
-            
-            facts = json.loads(content)
-            
-            return jsonify({
-                'success': True,
-                'facts': facts
-            })
-            
-        except json.JSONDecodeError as e:
-            print(f"❌ JSON parsing failed: {e}")
-            # Return fallback facts
-            return jsonify({
-                'success': True,
-                'facts': [
-                    {"icon": "📚", "text": f"'{title}' is a beloved {genre.lower()} novel by {author}."},
-                    {"icon": "✨", "text": "This book has captivated readers around the world with its compelling narrative."},
-                    {"icon": "🎭", "text": "The story features complex characters and intricate plot development."},
-                    {"icon": "🌟", "text": "Critics and readers alike have praised this work for its literary merit."}
-                ]
-            })
+            image_bytes = base64.b64decode(image_data)
+        except Exception as e:
+            return jsonify({"error": f"Invalid image data: {str(e)}"}), 400
+        if not is_supported_image(image_bytes):
+            return jsonify({"error": "Invalid image data: expected a JPEG, PNG, GIF or WebP image"}), 400
+        
+        cover_key = cover_cache_key(image_bytes)
+        book_info = cache_get(cover_key)
+        if book_info:
+            facts = cache_get(facts_cache_key(book_info['title'], book_info['author']))
+            if facts:
+                logger.info(f"⚡ Cache hit for {cover_key}")
+                return jsonify({**book_info, 'facts': facts})
+        
+        image_data = downscale_cover(image_bytes, image_data)
+        
+        async def identify_with_facts():
+            return await asyncio.gather(
+                identify_cover(image_data),
+                generate_facts('the book shown on this cover', image_data=image_data)
+            )
+        
+        (book_info, status), facts = run_async(identify_with_facts())
+        if status != 200:
+            return jsonify(book_info), status
+        
+        cache_set(cover_key, book_info)
+        if facts is None:
+            facts = fallback_facts(book_info['title'], book_info['author'], book_info['genre'])
+        elif len(facts) == len(FACT_CATEGORIES):
+            cache_set(facts_cache_key(book_info['title'], book_info['author']), facts)
+        return jsonify({**book_info, 'facts': facts})
         
     except Exception as e:
-        print(f"❌ Error generating book facts: {e}")
-        return jsonify({'error': f'Failed to generate facts: {str(e)}'}), 500
+        logger.error(f"❌ Error identifying book: {str(e)}")
+        return jsonify({"error": f"Failed to identify book: {str(e)}"}), 500
 
 @socketio.on('start_automation')
 def handle_automation(data):
@@ -260,27 +618,97 @@ def handle_automation(data):
             return
         
         if preview_url:
-            print(f"🚀 Starting automation for: {book_title} by {book_author} with preview URL: {preview_url}")
+            logger.info(f"🚀 Starting automation for: {book_title} by {book_author} with preview URL: {preview_url}")
         else:
-            print(f"🚀 Starting automation for: {book_title} by {book_author} (fallback to Archive.org)")
+            logger.info(f"🚀 Starting automation for: {book_title} by {book_author} (fallback to Archive.org)")
         
-        # Run automation in background
-        socketio.start_background_task(run_browser_automation, book_title, book_author, preview_url)
+        # Run automation in background, streaming its events back to this client only
+        socketio.start_background_task(run_browser_automation, book_title, book_author, preview_url, request.sid)
         
     except Exception as e:
-        print(f"❌ Error starting automation: {str(e)}")
+        logger.error(f"❌ Error starting automation: {str(e)}")
         emit('automation_error', {'error': str(e)})
 
-def run_browser_automation(book_title: str, book_author: str, preview_url: str = None):
-    """Run Playwright automation and emit progress updates."""
-    import subprocess
-    import asyncio
-    import sys
-    import os
+def store_screenshot(data_url: str, name: str) -> str:
+    """Write a data-URL screenshot under SCREENSHOTS_DIR and return its /screenshot URL."""
+    header, _, encoded = data_url.partition(',')
+    extension = 'jpg' if 'image/jpeg' in header else 'png'
+    filename = secure_filename(f"{name}.{extension}")
+    os.makedirs(SCREENSHOTS_DIR, exist_ok=True)
+    with open(os.path.join(SCREENSHOTS_DIR, filename), 'wb') as f:
+        f.write(base64.b64decode(encoded))
+    # Steps can repeat, so version the URL to make the browser refetch it
+    return f"/screenshot/{filename}?v={int(datetime.now().timestamp() * 1000)}"
+
+# Progress screenshots are only viewed while their automation is on screen
+PROGRESS_SCREENSHOT_TTL_SECONDS = 3600
+
+_HEX_DIGITS = frozenset('0123456789abcdef')
+
+def is_progress_screenshot(filename: str) -> bool:
+    """True for '<automation_id>_<step_id>' files from store_screenshot, not extracted pages."""
+    automation_id, sep, _ = filename.partition('_')
+    return bool(sep) and len(automation_id) == 12 and set(automation_id) <= _HEX_DIGITS
+
+def prune_progress_screenshots():
+    """Delete progress screenshots older than PROGRESS_SCREENSHOT_TTL_SECONDS."""
+    cutoff = datetime.now().timestamp() - PROGRESS_SCREENSHOT_TTL_SECONDS
+    try:
+        with os.scandir(SCREENSHOTS_DIR) as entries:
+            stale = [
+                entry.path for entry in entries
+                if is_progress_screenshot(entry.name) and entry.stat().st_mtime < cutoff
+            ]
+    except FileNotFoundError:
+        return
+    remove_files(stale)
+    if stale:
+        logger.info(f"🧹 Removed {len(stale)} old progress screenshots")
+
+def emit_extractor_progress(progress_data: dict, automation_id: str = None, sid: str = None):
+    """Forward a progress update from the Playwright extractor to the frontend."""
+    emit_data = {
+        'step_id': progress_data.get('step_id', 'unknown'),
+        'description': progress_data.get('description', ''),
+        'status': progress_data.get('status', 'running'),
+        'timestamp': datetime.now().isoformat()
+    }
+    # Include screenshot if present, by URL rather than inline base64
+    screenshot = progress_data.get('screenshot')
+    if screenshot:
+        if automation_id and screenshot.startswith('data:image/'):
+            try:
+                screenshot = store_screenshot(screenshot, f"{automation_id}_{emit_data['step_id']}")
+            except Exception as e:
+                logger.warning(f"⚠️ Could not store screenshot for {emit_data['step_id']}: {e}")
+        emit_data['screenshot'] = screenshot
+    
+    socketio.emit('automation_progress', emit_data, to=sid)
+
+def finish_automation(result: dict = None, error: str = None, sid: str = None):
+    """Emit the final automation event for a finished extraction."""
+    if error:
+        socketio.emit('automation_error', {
+            'error': error,
+            'timestamp': datetime.now().isoformat()
+        }, to=sid)
+        return
+    
+    # Playwright automation completed successfully
+    emit_data = {
+        'timestamp': datetime.now().isoformat()
+    }
+    if result:
+        emit_data['result'] = result
     
+    socketio.emit('automation_complete', emit_data, to=sid)
+    logger.info(f"✅ Playwright automation completed successfully")
+
+def run_browser_automation(book_title: str, book_author: str, preview_url: str = None, sid: str = None):
+    """Run Playwright automation and emit progress updates to the requesting client."""
     try:
         if not preview_url:
-            socketio.emit('automation_error', {'error': 'Preview URL is required for Playwright automation'})
+            socketio.emit('automation_error', {'error': 'Preview URL is required for Playwright automation'}, to=sid)
             return
         
         # Emit initial progress
@@ -290,92 +718,318 @@ def run_browser_automation(book_title: str, book_author: str, preview_url: str =
             'status': 'running',
             'url': preview_url,
             'timestamp': datetime.now().isoformat()
-        })
+        }, to=sid)
         
-        # Run the Playwright script
-        script_path = os.path.join(os.getcwd(), 'playwright_book_extractor.py')
-        python_path = os.path.join(os.getcwd(), 'browser_env', 'bin', 'python')
+        prune_progress_screenshots()
+        automation_id = uuid.uuid4().hex[:12]
+        on_progress = functools.partial(emit_extractor_progress, automation_id=automation_id, sid=sid)
         
         try:
-            # Run the Playwright script with timeout
-            process = subprocess.Popen(
-                [python_path, script_path, preview_url, book_title, book_author],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1,
-                universal_newlines=True
-            )
-            
-            # Read output in real-time and emit progress
-            result = None
-            while True:
-                output = process.stdout.readline()
-                if output == '' and process.poll() is not None:
-                    break
-                if output:
-                    line = output.strip()
-                    if line.startswith('PROGRESS:'):
-                        try:
-                            progress_data = json.loads(line.replace('PROGRESS:', ''))
-                            emit_data = {
-                                'step_id': progress_data.get('step_id', 'unknown'),
-                                'description': progress_data.get('description', ''),
-                                'status': progress_data.get('status', 'running'),
-                                'timestamp': datetime.now().isoformat()
-                            }
-                            # Include screenshot if present
-                            if 'screenshot' in progress_data:
-                                emit_data['screenshot'] = progress_data['screenshot']
-                            
-                            socketio.emit('automation_progress', emit_data)
-                        except:
-                            pass
-                    elif line.startswith('RESULT:'):
-                        try:
-                            result_text = line.replace('RESULT:', '')
-                            result = json.loads(result_text)
-                            print(f"✅ Captured GPT-4 analysis result: {len(result_text)} characters")
-                        except Exception as e:
-                            print(f"❌ Failed to parse RESULT line: {e}")
-                            print(f"Raw line: {repr(line)}")
-                            pass
-            
-            # Wait for process to complete
-            stdout, stderr = process.communicate()
-            
-            if process.returncode == 0:
-                # Playwright automation completed successfully
-                emit_data = {
-                    'timestamp': datetime.now().isoformat()
-                }
-                if result:
-                    emit_data['result'] = result
-                
-                socketio.emit('automation_complete', emit_data)
-                print(f"✅ Playwright automation completed successfully")
-            else:
-                error_msg = stderr or "Unknown error occurred"
-                socketio.emit('automation_error', {
-                    'error': f'Playwright automation failed: {error_msg}',
-                    'timestamp': datetime.now().isoformat()
-                })
-                
-        except Exception as e:
-            print(f"❌ Failed to run Playwright script: {str(e)}")
-            socketio.emit('automation_error', {
-                'error': f'Failed to start Playwright automation: {str(e)}',
-                'timestamp': datetime.now().isoformat()
-            })
+            from playwright_book_extractor import run as run_extraction
+        except ImportError as e:
+            logger.warning(f"⚠️ Playwright extractor not importable ({e}), running it as a subprocess")
+            run_extractor_subprocess(book_title, book_author, preview_url, on_progress, sid)
+            return
+        
+        # Run the extractor on the shared event loop; progress arrives via callback
+        future = asyncio.run_coroutine_threadsafe(
+            run_extraction(preview_url, book_title, book_author, on_progress),
+            async_loop
+        )
+        
+        def on_extraction_done(future):
+            try:
+                result = future.result()
+                logger.info(f"✅ Captured GPT-4 analysis result for: {book_title}")
+                finish_automation(result=result, sid=sid)
+            except Exception as e:
+                logger.error(f"❌ Playwright automation failed: {str(e)}")
+                finish_automation(error=f'Playwright automation failed: {str(e)}', sid=sid)
+        
+        future.add_done_callback(on_extraction_done)
         
     except Exception as e:
-        print(f"❌ Automation error: {str(e)}")
+        logger.error(f"❌ Automation error: {str(e)}")
         socketio.emit('automation_error', {
             'error': str(e),
             'timestamp': datetime.now().isoformat()
+        }, to=sid)
+
+class ExtractorSupervisor:
+    """Watches the output pipes of every extractor subprocess from a single thread."""
+
+    PROGRESS_PREFIX = b'PROGRESS:'
+    RESULT_PREFIX = b'RESULT:'
+
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+        self._pending = queue.SimpleQueue()
+        self._wake_r, self._wake_w = os.pipe()
+        self._selector.register(self._wake_r, selectors.EVENT_READ)
+        self._thread = threading.Thread(target=self._run, name='extractor-supervisor', daemon=True)
+        self._thread.start()
+
+    def watch(self, process, on_progress, on_exit):
+        """Start relaying a process; on_exit(returncode, result, stderr) is called once it ends."""
+        self._pending.put({
+            'process': process,
+            'on_progress': on_progress,
+            'on_exit': on_exit,
+            'open_pipes': 2,
+            'stdout': bytearray(),
+            'stderr': bytearray(),
+            'result': None
         })
+        os.write(self._wake_w, b'\0')
+
+    def _run(self):
+        while True:
+            for key, _ in self._selector.select():
+                if key.fileobj == self._wake_r:
+                    os.read(self._wake_r, 1024)
+                    self._register_pending()
+                else:
+                    self._read(key)
+
+    def _register_pending(self):
+        while not self._pending.empty():
+            watched = self._pending.get()
+            process = watched['process']
+            self._selector.register(process.stdout, selectors.EVENT_READ, (watched, 'stdout'))
+            self._selector.register(process.stderr, selectors.EVENT_READ, (watched, 'stderr'))
+
+    def _read(self, key):
+        watched, stream = key.data
+        chunk = os.read(key.fd, 65536)
+        
+        if not chunk:
+            self._selector.unregister(key.fileobj)
+            key.fileobj.close()
+            watched['open_pipes'] -= 1
+            if stream == 'stdout' and watched['stdout']:
+                self._dispatch(watched, bytes(watched['stdout']))
+            if watched['open_pipes'] == 0:
+                self._finish(watched)
+            return
+        
+        if stream == 'stderr':
+            watched['stderr'] += chunk
+            return
+        
+        buffer = watched['stdout']
+        buffer += chunk
+        *lines, rest = buffer.split(b'\n')
+        buffer[:] = rest
+        for line in lines:
+            self._dispatch(watched, line)
+
+    def _dispatch(self, watched, line: bytes):
+        # Only marker lines carry JSON; everything else is extractor debug output
+        try:
+            if line.startswith(self.PROGRESS_PREFIX):
+                watched['on_progress'](orjson.loads(line[len(self.PROGRESS_PREFIX):]))
+            elif line.startswith(self.RESULT_PREFIX):
+                watched['result'] = orjson.loads(line[len(self.RESULT_PREFIX):])
+                logger.info(f"✅ Captured GPT-4 analysis result: {len(line)} characters")
+        except Exception as e:
+            logger.error(f"❌ Failed to handle extractor output: {e}")
+
+    def _finish(self, watched):
+        returncode = watched['process'].wait()
+        stderr = watched['stderr'].decode('utf-8', errors='replace')
+        try:
+            watched['on_exit'](returncode, watched['result'], stderr)
+        except Exception as e:
+            logger.error(f"❌ Error finishing extractor process: {e}")
+
+extractor_supervisor = ExtractorSupervisor()
+
+def run_extractor_subprocess(book_title: str, book_author: str, preview_url: str, on_progress=emit_extractor_progress, sid: str = None):
+    """Run the Playwright extractor in the browser_env interpreter and relay its output."""
+    # Run the Playwright script
+    script_path = os.path.join(os.getcwd(), 'playwright_book_extractor.py')
+    python_path = os.path.join(os.getcwd(), 'browser_env', 'bin', 'python')
+    
+    try:
+        process = subprocess.Popen(
+            [python_path, script_path, preview_url, book_title, book_author],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        
+        def on_exit(returncode, result, stderr):
+            if returncode == 0:
+                finish_automation(result=result, sid=sid)
+            else:
+                error_msg = stderr or "Unknown error occurred"
+                finish_automation(error=f'Playwright automation failed: {error_msg}', sid=sid)
+        
+        extractor_supervisor.watch(process, on_progress, on_exit)
+            
+    except Exception as e:
+        logger.error(f"❌ Failed to run Playwright script: {str(e)}")
+        finish_automation(error=f'Failed to start Playwright automation: {str(e)}', sid=sid)
+
+CONTENT_FILE_PATTERN = 'extracted_content_*.md'
+CONTENT_FILE_PREFIX, CONTENT_FILE_SUFFIX = 'extracted_content_', '.md'
+# Files smaller than this can only hold whitespace, so they aren't worth opening
+MIN_CONTENT_FILE_SIZE = 2
+# Sections longer than the threshold are streamed as content_chunk messages
+CONTENT_CHUNK_THRESHOLD = 64 * 1024
+CONTENT_CHUNK_SIZE = 32 * 1024
+SENT_CONTENT_FILES_LIMIT = 10_000
+
+def remove_files(paths):
+    """Unlink each path, ignoring ones that are already gone. Blocking; use asyncio.to_thread."""
+    for path in paths:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+def read_text_file(path: str) -> str:
+    """Blocking file read, meant to be run off the event loop with asyncio.to_thread."""
+    with open(path, 'r') as f:
+        return f.read()
+
+# Temp directories browser-use agents save extracted content under
+AGENT_DIR_PATTERN = 'browser_use_agent_*'
+
+class ContentFileHandler(FileSystemEventHandler):
+    """Forwards writes to extracted_content_*.md files to an asyncio loop."""
+
+    def __init__(self, loop, callback, on_directory_created=None):
+        self.loop = loop
+        self.callback = callback
+        # Called on the observer thread with the path of each new directory
+        self.on_directory_created = on_directory_created
+
+    def _forward(self, path):
+        if fnmatch.fnmatch(os.path.basename(path), CONTENT_FILE_PATTERN):
+            self.loop.call_soon_threadsafe(self.callback, path)
+
+    def on_created(self, event):
+        if event.is_directory:
+            if self.on_directory_created is not None:
+                self.on_directory_created(event.src_path)
+        else:
+            self._forward(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self._forward(event.src_path)
+
+    # Files may be created empty and filled afterwards, so later writes count too
+    on_closed = on_modified
+
+    def forward_existing(self, directory: str):
+        """Forward content files already under directory, e.g. written before it was watched."""
+        for parent, _, filenames in os.walk(directory):
+            for name in filenames:
+                self._forward(os.path.join(parent, name))
+
+    def on_deleted(self, event):
+        if not event.is_directory:
+            self._forward(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self._forward(event.src_path)
+            self._forward(event.dest_path)
+
+class ContentFileIndex:
+    """Memoized os.scandir listings of the directories extracted content is saved to.
+
+    Listings are kept for the automation's lifetime and dropped per directory
+    when the watchdog observer reports a content file change there.
+    """
+
+    def __init__(self):
+        self._roots = {}  # path -> recursive
+        self._root_patterns = []  # (parent, subdirectory pattern, recursive)
+        self._listings = {}  # directory -> (subdirectories, {name: stat_result})
 
-async def run_automation_async(book_title: str, book_author: str, target_url: str, preview_url: str = None):
+    def add_root(self, path: str, recursive: bool = False):
+        if path and path not in self._roots:
+            self._roots[path] = recursive
+
+    def add_root_pattern(self, parent: str, pattern: str, recursive: bool = False):
+        """Treat every subdirectory of parent matching pattern as a root, without walking parent."""
+        self._root_patterns.append((parent, pattern, recursive))
+
+    def invalidate(self, directory: str):
+        # Parents are dropped too so a newly created subdirectory gets discovered
+        while True:
+            self._listings.pop(directory, None)
+            parent = os.path.dirname(directory)
+            if directory in self._roots or parent == directory:
+                break
+            directory = parent
+
+    def _listing(self, directory: str):
+        listing = self._listings.get(directory)
+        if listing is None:
+            subdirectories, files = [], {}
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        # Hidden entries and bytecode caches never hold extracted content
+                        if entry.name.startswith('.') or entry.name == '__pycache__':
+                            continue
+                        # DirEntry caches its type from the directory read, so no extra stat here
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirectories.append(entry.path)
+                        elif entry.name.startswith(CONTENT_FILE_PREFIX) and entry.name.endswith(CONTENT_FILE_SUFFIX):
+                            files[entry.name] = entry.stat()
+            except OSError:
+                pass
+            listing = self._listings[directory] = (subdirectories, files)
+        return listing
+
+    def _all_roots(self):
+        yield from self._roots.items()
+        for parent, pattern, recursive in self._root_patterns:
+            for subdirectory in self._listing(parent)[0]:
+                if fnmatch.fnmatch(os.path.basename(subdirectory), pattern):
+                    yield subdirectory, recursive
+
+    def _directories(self):
+        visited = set()
+        for root, recursive in self._all_roots():
+            pending = [root]
+            while pending:
+                directory = pending.pop()
+                if directory in visited:
+                    continue
+                visited.add(directory)
+                yield directory
+                if recursive:
+                    pending.extend(self._listing(directory)[0])
+
+    def find_new(self, sent: set) -> set:
+        """Return the real paths of content files under the roots that aren't in sent."""
+        new_paths = set()
+        for directory in self._directories():
+            for name in self._listing(directory)[1]:
+                # Roots can alias each other (e.g. /tmp vs /private/tmp on macOS)
+                path = os.path.realpath(os.path.join(directory, name))
+                if path not in sent:
+                    new_paths.add(path)
+        return new_paths
+
+@contextlib.asynccontextmanager
+async def temporary_browser_profile():
+    """Create a fresh browser profile directory and remove it off the event loop afterwards."""
+    temp_profile_dir = tempfile.mkdtemp(prefix=f"bookfetcher_browser_{uuid.uuid4().hex[:8]}_")
+    logger.info(f"🆕 Using fresh browser profile: {temp_profile_dir}")
+    try:
+        yield temp_profile_dir
+    finally:
+        # A Chrome profile is thousands of small files; don't delete them on the loop
+        await asyncio.to_thread(shutil.rmtree, temp_profile_dir, ignore_errors=True)
+        logger.info(f"🧹 Cleaned up temporary browser profile: {temp_profile_dir}")
+
+async def run_automation_async(book_title: str, book_author: str, target_url: str, preview_url: str = None, sid: str = None):
     """Async function to run browser automation with simplified, robust approach."""
     try:
         from browser_use import Agent
@@ -388,7 +1042,7 @@ async def run_automation_async(book_title: str, book_author: str, target_url: st
             'status': 'running',
             'url': target_url,
             'timestamp': datetime.now().isoformat()
-        })
+        }, to=sid)
         
         # Create task based on whether we have a preview URL
         if preview_url:
@@ -445,319 +1099,341 @@ async def run_automation_async(book_title: str, book_author: str, target_url: st
         
         # Create browser agent with fresh session each time
         from browser_use import Agent, BrowserConfig, Browser
-        import tempfile
-        import uuid
         
         # Create a unique temporary profile for each session to ensure fresh start
-        temp_profile_dir = tempfile.mkdtemp(prefix=f"bookfetcher_browser_{uuid.uuid4().hex[:8]}_")
-        print(f"🆕 Using fresh browser profile: {temp_profile_dir}")
-        
-        # Configure browser to run in true headless mode with fresh profile
-        browser = Browser(config=BrowserConfig(
-            headless=True,  # This is the correct way to set headless
-            chrome_instance_path=None,  # Use default Chrome/Chromium
-            user_data_dir=temp_profile_dir,  # Fresh temporary profile each time
-            new_context_config={
-                'viewport': {'width': 1280, 'height': 720},
-                'user_agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-            }
-        ))
-        
-        agent = Agent(
-            task=simple_task,
-            llm=ChatOpenAI(
-                model="gpt-4o",  # Vision-capable model to read text from book page images
-                temperature=0.1  # Very low temperature for precise, focused behavior
-            ),
-            browser=browser,  # Pass the configured browser
-            max_failures=2,  # Quick failure recovery
-            max_actions_per_step=1,  # Single action per step for better control
-            max_steps=9   # Limited steps: navigate(1) + click book(1) + check start(1) + extract(1) + next(1) + extract(1) + next(1) + extract(1) + stop(1)
-        )
+        async with temporary_browser_profile() as temp_profile_dir:
+            # Configure browser to run in true headless mode with fresh profile
+            browser = Browser(config=BrowserConfig(
+                headless=True,  # This is the correct way to set headless
+                chrome_instance_path=None,  # Use default Chrome/Chromium
+                user_data_dir=temp_profile_dir,  # Fresh temporary profile each time
+                new_context_config={
+                    'viewport': {'width': 1280, 'height': 720},
+                    'user_agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+                }
+            ))
+        
+            agent = Agent(
+                task=simple_task,
+                llm=ChatOpenAI(
+                    model="gpt-4o",  # Vision-capable model to read text from book page images
+                    temperature=0.1  # Very low temperature for precise, focused behavior
+                ),
+                browser=browser,  # Pass the configured browser
+                max_failures=2,  # Quick failure recovery
+                max_actions_per_step=1,  # Single action per step for better control
+                max_steps=9   # Limited steps: navigate(1) + click book(1) + check start(1) + extract(1) + next(1) + extract(1) + next(1) + extract(1) + stop(1)
+            )
 
-        # Create screenshot capture function with correct browser-use API
-        async def capture_browser_state():
-            try:
-                if hasattr(agent, 'browser_session') and agent.browser_session:
-                    # Use the correct browser-use API to get current page
-                    current_page = await agent.browser_session.get_current_page()
-                    if current_page:
-                        screenshot = await current_page.screenshot()
-                        screenshot_b64 = base64.b64encode(screenshot).decode('utf-8')
+            # Create screenshot capture function with correct browser-use API
+            async def capture_browser_state():
+                try:
+                    if hasattr(agent, 'browser_session') and agent.browser_session:
+                        # Use the correct browser-use API to get current page
+                        current_page = await agent.browser_session.get_current_page()
+                        if current_page:
+                            screenshot = await current_page.screenshot()
+                            screenshot_b64 = base64.b64encode(screenshot).decode('utf-8')
                         
-                        print(f"📸 Screenshot captured from: {current_page.url}")
+                            logger.debug(f"📸 Screenshot captured from: {current_page.url}")
                         
-                        # Emit screenshot to frontend
-                        socketio.emit('browser_screenshot', {
-                            'screenshot': f"data:image/png;base64,{screenshot_b64}",
-                            'url': current_page.url,
-                            'timestamp': datetime.now().isoformat()
-                        })
+                            # Emit screenshot to frontend
+                            socketio.emit('browser_screenshot', {
+                                'screenshot': f"data:image/png;base64,{screenshot_b64}",
+                                'url': current_page.url,
+                                'timestamp': datetime.now().isoformat()
+                            }, to=sid)
                         
-            except Exception as e:
-                print(f"📸 Screenshot capture failed: {e}")
+                except Exception as e:
+                    logger.info(f"📸 Screenshot capture failed: {e}")
 
-        # Start periodic screenshot capture and content monitoring
-        screenshot_task = None
-        content_monitor_task = None
-        sent_content_files = set()  # Track which files we've already sent
+            # Start periodic screenshot capture and content monitoring; stop_event asks
+            # both helpers to wrap up once the agent is done
+            stop_event = asyncio.Event()
+            # Real path -> (st_mtime_ns, st_size) of the version we sent, bounded so a
+            # long run that churns through files can't grow it without limit
+            sent_content_files = LRUCache(maxsize=SENT_CONTENT_FILES_LIMIT)
+            pending_sections = []  # Content sections waiting for the next content_extracted emit
+            chunked_sections = 0  # Oversized sections sent as content_chunk messages so far
         
-        try:
-            # Start screenshot task
-            async def screenshot_loop():
-                while True:
-                    await capture_browser_state()
-                    await asyncio.sleep(2)  # Screenshot every 2 seconds
-            
-            # Start content monitoring task
-            async def content_monitor_loop():
-                while True:
-                    try:
-                        # Check for new content files periodically
-                        import glob
-                        import tempfile
-                        import os
-                        
-                        current_files = set(glob.glob("extracted_content_*.md"))
-                        temp_dir = tempfile.gettempdir()
-                        current_files.update(glob.glob(f"{temp_dir}/**/extracted_content_*.md", recursive=True))
-                        
-                        # Check for new files we haven't sent yet
-                        new_files = current_files - sent_content_files
-                        if new_files:
-                            new_content = []
-                            for file_path in new_files:
-                                try:
-                                    with open(file_path, 'r') as f:
-                                        file_content = f.read()
-                                        if file_content.strip():
-                                            new_content.append(f"From {os.path.basename(file_path)}:\n{file_content}")
-                                            print(f"📚 Found new content file: {file_path}")
-                                    sent_content_files.add(file_path)
-                                except Exception as e:
-                                    print(f"Error reading new content file {file_path}: {e}")
-                            
-                            # Send new content immediately to frontend
-                            if new_content:
-                                socketio.emit('content_extracted', {
-                                    'book_title': book_title,
-                                    'book_author': book_author,
-                                    'content_sections': new_content,
-                                    'timestamp': datetime.now().isoformat()
-                                })
-                                print(f"📡 Sent {len(new_content)} new content sections to frontend")
-                        
-                    except Exception as e:
-                        print(f"Error in content monitor: {e}")
+            async def flush_pending(ts: str, **extra):
+                """Send pending content sections as one content_extracted message, chunking huge ones."""
+                nonlocal chunked_sections
+                if not pending_sections:
+                    return
+                sections = pending_sections.copy()
+                pending_sections.clear()
+                
+                small_sections = [section for section in sections if len(section) <= CONTENT_CHUNK_THRESHOLD]
+                if small_sections:
+                    socketio.emit('content_extracted', {
+                        'book_title': book_title,
+                        'book_author': book_author,
+                        'content_sections': small_sections,
+                        **extra,
+                        'timestamp': ts
+                    }, to=sid)
+                
+                # Oversized sections go out as content_chunk messages the client reassembles;
+                # section_index numbers only the chunked sections, across every flush of this run
+                for section in sections:
+                    if len(section) <= CONTENT_CHUNK_THRESHOLD:
+                        continue
+                    for offset in range(0, len(section), CONTENT_CHUNK_SIZE):
+                        socketio.emit('content_chunk', {
+                            'book_title': book_title,
+                            'section_index': chunked_sections,
+                            'offset': offset,
+                            'total_length': len(section),
+                            'text': section[offset:offset + CONTENT_CHUNK_SIZE]
+                        }, to=sid)
+                        await asyncio.sleep(0)
+                    chunked_sections += 1
+                logger.info(f"📡 Sent {len(sections)} content sections to frontend")
+        
+            async def read_unsent_content(file_path: str):
+                """Read a content file unless it is empty or this version was already sent, marking it sent."""
+                # Skip empty files and versions already sent without opening them;
+                # files rewritten in place get a new version and are sent again
+                st = os.stat(file_path)
+                version = (st.st_mtime_ns, st.st_size)
+                if st.st_size < MIN_CONTENT_FILE_SIZE or sent_content_files.get(file_path) == version:
+                    return None
+                file_content = await asyncio.to_thread(read_text_file, file_path)
+                # Empty files are picked up again on their next write
+                if not file_content.strip():
+                    return None
+                sent_content_files[file_path] = version
+                return file_content
+        
+            # Watch the directories browser-use saves content to instead of rescanning them;
+            # a burst of writes sets the event once and is handled in a single wake-up
+            new_file_event = asyncio.Event()
+            changed_content_paths = set()
+        
+            temp_root = tempfile.gettempdir()
+            content_index = ContentFileIndex()
+            # Only descend into the places browser-use writes to, never the whole temp dir
+            content_index.add_root(os.getcwd())
+            # The Chrome profile's subdirectories churn constantly and never hold content files
+            content_index.add_root(temp_profile_dir)
+            content_index.add_root_pattern(temp_root, AGENT_DIR_PATTERN, recursive=True)
+        
+            def on_content_file(path):
+                content_index.invalidate(os.path.dirname(path))
+                changed_content_paths.add(os.path.realpath(path))
+                new_file_event.set()
+        
+            def watch_agent_dir(path):
+                # Each inotify watch covers one directory, so recursively watch only the agent
+                # directories in the temp dir rather than every subtree of the temp dir
+                if os.path.dirname(path) != temp_root or not fnmatch.fnmatch(os.path.basename(path), AGENT_DIR_PATTERN):
+                    return
+                content_observer.schedule(content_handler, path, recursive=True)
+                content_handler.forward_existing(path)
+        
+            content_handler = ContentFileHandler(asyncio.get_running_loop(), on_content_file, watch_agent_dir)
+            content_observer = Observer()
+            content_observer.schedule(content_handler, os.getcwd(), recursive=False)
+            content_observer.schedule(content_handler, temp_profile_dir, recursive=False)
+            # Top level only, to notice new agent directories being created
+            content_observer.schedule(content_handler, temp_root, recursive=False)
+            with os.scandir(temp_root) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        watch_agent_dir(entry.path)
+            content_observer.start()
+        
+            try:
+                # Start screenshot task
+                async def screenshot_loop():
+                    while not stop_event.is_set():
+                        await capture_browser_state()
+                        try:
+                            await asyncio.wait_for(stop_event.wait(), timeout=2)  # Screenshot every 2 seconds
+                        except asyncio.TimeoutError:
+                            pass
+            
+                # Start content monitoring task
+                async def content_monitor_loop():
+                    while True:
+                        # Sleep until the observer reports content file writes
+                        await new_file_event.wait()
+                        new_file_event.clear()
+                        changed_paths = sorted(changed_content_paths)
+                        changed_content_paths.clear()
+                    
+                        for i, file_path in enumerate(changed_paths):
+                            # Hand control back regularly so a burst can't starve the screenshot task
+                            if i % 8 == 0:
+                                await asyncio.sleep(0)
+                            try:
+                                file_content = await read_unsent_content(file_path)
+                                if file_content is not None:
+                                    logger.info(f"📚 Found new content file: {file_path}")
+                                    pending_sections.append(f"From {os.path.basename(file_path)}:\n{file_content}")
+                            except FileNotFoundError:
+                                pass
+                            except Exception as e:
+                                logger.error(f"Error reading new content file {file_path}: {e}")
                     
-                    await asyncio.sleep(3)  # Check for content every 3 seconds
+                        # Everything found in this wake-up goes out as one message
+                        await flush_pending(datetime.now().isoformat())
+                        if stop_event.is_set():
+                            return
             
-            screenshot_task = asyncio.create_task(screenshot_loop())
-            content_monitor_task = asyncio.create_task(content_monitor_loop())
+                helper_tasks = {
+                    asyncio.create_task(screenshot_loop()),
+                    asyncio.create_task(content_monitor_loop())
+                }
+                agent_task = asyncio.create_task(agent.run())
             
-            # Run the agent with extended timeout for Archive.org navigation
-            result = await asyncio.wait_for(agent.run(), timeout=300)  # 5 minute timeout
+                try:
+                    # Run the agent with extended timeout for Archive.org navigation
+                    done, _ = await asyncio.wait({agent_task}, timeout=300)  # 5 minute timeout
+                finally:
+                    if not agent_task.done():
+                        agent_task.cancel()
+                    # Let the monitor drain one last time instead of cancelling it mid-emit
+                    stop_event.set()
+                    new_file_event.set()
+                    _, unfinished = await asyncio.wait(helper_tasks, timeout=5)
+                    for task in unfinished:
+                        task.cancel()
             
-            # Cancel background tasks
-            if screenshot_task:
-                screenshot_task.cancel()
-            if content_monitor_task:
-                content_monitor_task.cancel()
+                if agent_task not in done:
+                    raise asyncio.TimeoutError()
+                result = agent_task.result()
             
-            # Cleanup temporary browser profile
-            try:
-                import shutil
-                shutil.rmtree(temp_profile_dir, ignore_errors=True)
-                print(f"🧹 Cleaned up temporary browser profile: {temp_profile_dir}")
-            except Exception as e:
-                print(f"Warning: Could not cleanup temp profile {temp_profile_dir}: {e}")
+                # Process and extract meaningful content from result
+                extracted_content = []
+                result_text = str(result) if result else ""
             
-            # Process and extract meaningful content from result
-            extracted_content = []
-            result_text = str(result) if result else ""
+                logger.debug("🔍 Automation result type: %s", type(result))
+                logger.debug("🔍 Result text preview: %s...", result_text[:200])
             
-            print(f"🔍 Automation result type: {type(result)}")
-            print(f"🔍 Result text preview: {result_text[:200]}...")
+                # Try to extract any text content that was found
+                result_text_lower = result_text.lower()
+                if "extracted_content" in result_text_lower or "text" in result_text_lower:
+                    extracted_content.append(result_text)
+                    logger.info("📝 Added result text to extracted content")
             
-            # Try to extract any text content that was found
-            if "extracted_content" in result_text.lower() or "text" in result_text.lower():
-                extracted_content.append(result_text)
-                print("📝 Added result text to extracted content")
+                # Check for any saved content files in the watched locations
+                agent_temp_dir = getattr(getattr(agent, 'browser_session', None), 'temp_dir', None)
+                content_index.add_root(agent_temp_dir, recursive=True)
+                content_files = content_index.find_new(sent_content_files)
+                logger.debug(f"🔍 Found {len(content_files)} unsent content files")
             
-            # Check for any saved content files in multiple locations
-            import glob
-            import tempfile
-            import os
+                # Files the monitor already streamed are skipped below but cleaned up too
+                to_delete = list(sent_content_files)
+                for i, file_path in enumerate(sorted(content_files)):
+                    if i % 8 == 0:
+                        await asyncio.sleep(0)
+                    try:
+                        file_content = await read_unsent_content(file_path)
+                        if file_content is not None:
+                            extracted_content.append(f"From {os.path.basename(file_path)}:\n{file_content}")
+                            logger.info(f"📚 Found extracted content file: {file_path}")
+                        to_delete.append(file_path)
+                    except Exception as e:
+                        logger.error(f"Error reading content file {file_path}: {e}")
             
-            # Search in current directory
-            content_files = glob.glob("extracted_content_*.md")
-            print(f"🔍 Found {len(content_files)} content files in current directory")
+                # Prepare content summary
+                content_summary = "Automation completed successfully."
+                if extracted_content:
+                    content_summary = f"Extracted {len(extracted_content)} content sections."
             
-            # Also search in system temp directory where browser-use might save files
-            temp_dir = tempfile.gettempdir()
-            temp_content_files = glob.glob(f"{temp_dir}/**/extracted_content_*.md", recursive=True)
-            content_files.extend(temp_content_files)
-            print(f"🔍 Found {len(temp_content_files)} content files in temp directory: {temp_dir}")
+                # Emit completion; the content itself only travels in content_extracted
+                ts = datetime.now().isoformat()
+                socketio.emit('automation_progress', {
+                    'step_id': 'step3', 
+                    'description': f'✅ {content_summary}',
+                    'status': 'completed',
+                    'timestamp': ts
+                }, to=sid)
             
-            # If agent has a file system path, search there too
-            try:
-                if hasattr(agent, 'browser_session') and hasattr(agent.browser_session, 'temp_dir'):
-                    agent_temp_files = glob.glob(f"{agent.browser_session.temp_dir}/**/extracted_content_*.md", recursive=True)
-                    content_files.extend(agent_temp_files)
-                    print(f"🔍 Found {len(agent_temp_files)} content files in agent temp directory")
+                pending_sections.extend(extracted_content)
+                await flush_pending(ts)
                 
-                # Also check browser-use typical temp paths
-                import os
-                home_dir = os.path.expanduser("~")
-                browser_use_temp = f"{temp_dir}/browser_use_agent_*"
-                browser_use_dirs = glob.glob(browser_use_temp)
-                for dir_path in browser_use_dirs:
-                    dir_content_files = glob.glob(f"{dir_path}/**/extracted_content_*.md", recursive=True)
-                    content_files.extend(dir_content_files)
-                    print(f"🔍 Found {len(dir_content_files)} content files in browser-use dir: {dir_path}")
-            except Exception as e:
-                print(f"Error searching additional directories: {e}")
+                # Clean up temp files in one batch, off the event loop
+                await asyncio.to_thread(remove_files, to_delete)
             
-            for file_path in content_files:
-                try:
-                    with open(file_path, 'r') as f:
-                        file_content = f.read()
-                        if file_content.strip():
-                            extracted_content.append(f"From {os.path.basename(file_path)}:\n{file_content}")
-                            print(f"📚 Found extracted content file: {file_path}")
-                    # Clean up temp files
-                    os.remove(file_path)
-                except Exception as e:
-                    print(f"Error reading content file {file_path}: {e}")
-            
-            # Prepare content summary
-            content_summary = "Automation completed successfully."
-            if extracted_content:
-                content_summary = f"Extracted {len(extracted_content)} content sections."
-            
-            # Emit completion with extracted content
-            socketio.emit('automation_progress', {
-                'step_id': 'step3', 
-                'description': f'✅ {content_summary}',
-                'status': 'completed',
-                'extracted_content': extracted_content,
-                'result': result_text,
-                'timestamp': datetime.now().isoformat()
-            })
-            
-            # Emit the extracted content separately for better frontend handling
-            if extracted_content:
-                socketio.emit('content_extracted', {
+                return {
+                    'success': True,
+                    'content': extracted_content if extracted_content else [result_text],
+                    'content_summary': content_summary,
                     'book_title': book_title,
                     'book_author': book_author,
-                    'content_sections': extracted_content,
-                    'timestamp': datetime.now().isoformat()
-                })
-            
-            return {
-                'success': True,
-                'content': extracted_content if extracted_content else [result_text],
-                'content_summary': content_summary,
-                'book_title': book_title,
-                'book_author': book_author,
-                'extraction_time': datetime.now().isoformat()
-            }
-            
-        except asyncio.TimeoutError:
-            if screenshot_task:
-                screenshot_task.cancel()
-            if content_monitor_task:
-                content_monitor_task.cancel()
+                    'extraction_time': ts
+                }
             
-            # Cleanup temporary browser profile
-            try:
-                import shutil
-                shutil.rmtree(temp_profile_dir, ignore_errors=True)
-                print(f"🧹 Cleaned up temporary browser profile after timeout: {temp_profile_dir}")
-            except:
-                pass
-                
-            print("❌ Automation timed out after 5 minutes")
+            except asyncio.TimeoutError:
+                logger.error("❌ Automation timed out after 5 minutes")
             
-            # Check for any partial content that may have been extracted
-            partial_content = []
+                # Check for any partial content that may have been extracted
+                partial_content = []
             
-            # Search in multiple locations for partial content
-            content_files = glob.glob("extracted_content_*.md")
-            temp_dir = tempfile.gettempdir()
-            content_files.extend(glob.glob(f"{temp_dir}/**/extracted_content_*.md", recursive=True))
+                # Search the watched locations for partial content
+                content_files = content_index.find_new(sent_content_files)
             
-            for file_path in content_files:
-                try:
-                    with open(file_path, 'r') as f:
-                        file_content = f.read()
-                        if file_content.strip():
+                to_delete = list(sent_content_files)
+                for file_path in sorted(content_files):
+                    try:
+                        # Files the monitor already streamed are skipped, as on the success path
+                        file_content = await read_unsent_content(file_path)
+                        if file_content is not None:
                             partial_content.append(f"Partial from {os.path.basename(file_path)}:\n{file_content}")
-                            print(f"📚 Found partial content in: {file_path}")
-                    os.remove(file_path)
-                except:
-                    pass
-            
-            socketio.emit('automation_progress', {
-                'step_id': 'step3', 
-                'description': '⏱️ Automation timed out but may have found some content',
-                'status': 'timeout',
-                'error': 'Timeout after 5 minutes',
-                'extracted_content': partial_content,
-                'timestamp': datetime.now().isoformat()
-            })
-            
-            if partial_content:
-                socketio.emit('content_extracted', {
+                            logger.info(f"📚 Found partial content in: {file_path}")
+                        to_delete.append(file_path)
+                    except:
+                        pass
+            
+                ts = datetime.now().isoformat()
+                # As on success, the content itself only travels in content_extracted
+                socketio.emit('automation_progress', {
+                    'step_id': 'step3', 
+                    'description': '⏱️ Automation timed out but may have found some content',
+                    'status': 'timeout',
+                    'error': 'Timeout after 5 minutes',
+                    'timestamp': ts
+                }, to=sid)
+            
+                pending_sections.extend(partial_content)
+                await flush_pending(ts, note='Partial extraction due to timeout')
+                await asyncio.to_thread(remove_files, to_delete)
+            
+                return {
+                    'success': False, 
+                    'error': 'Automation timed out - Archive.org may be slow',
+                    'partial_content': partial_content,
                     'book_title': book_title,
-                    'book_author': book_author,
-                    'content_sections': partial_content,
-                    'note': 'Partial extraction due to timeout',
-                    'timestamp': datetime.now().isoformat()
-                })
-            
-            return {
-                'success': False, 
-                'error': 'Automation timed out - Archive.org may be slow',
-                'partial_content': partial_content,
-                'book_title': book_title,
-                'book_author': book_author
-            }
+                    'book_author': book_author
+                }
             
-        except Exception as e:
-            if screenshot_task:
-                screenshot_task.cancel()
-            if content_monitor_task:
-                content_monitor_task.cancel()
+            except Exception as e:
+                logger.error(f"❌ Browser automation failed: {e}")
             
-            # Cleanup temporary browser profile
-            try:
-                import shutil
-                shutil.rmtree(temp_profile_dir, ignore_errors=True)
-                print(f"🧹 Cleaned up temporary browser profile after error: {temp_profile_dir}")
-            except:
-                pass
-                
-            print(f"❌ Browser automation failed: {e}")
-            
-            # Emit error
-            socketio.emit('automation_progress', {
-                'step_id': 'step3', 
-                'description': f'❌ Automation failed: {str(e)}',
-                'status': 'error',
-                'error': str(e),
-                'timestamp': datetime.now().isoformat()
-            })
-            
-            return {
-                'success': False, 
-                'error': str(e),
-                'book_title': book_title,
-                'book_author': book_author
-            }
+                # Emit error
+                socketio.emit('automation_progress', {
+                    'step_id': 'step3', 
+                    'description': f'❌ Automation failed: {str(e)}',
+                    'status': 'error',
+                    'error': str(e),
+                    'timestamp': datetime.now().isoformat()
+                }, to=sid)
+            
+                return {
+                    'success': False, 
+                    'error': str(e),
+                    'book_title': book_title,
+                    'book_author': book_author
+                }
+        
+            finally:
+                content_observer.stop()
             
     except Exception as e:
-        print(f"❌ Automation setup failed: {e}")
+        logger.error(f"❌ Automation setup failed: {e}")
         
         # Emit error
         socketio.emit('automation_progress', {
@@ -766,7 +1442,7 @@ async def run_automation_async(book_title: str, book_author: str, target_url: st
             'status': 'error',
             'error': str(e),
             'timestamp': datetime.now().isoformat()
-        })
+        }, to=sid)
         
         return {
             'success': False, 
@@ -777,6 +1453,49 @@ async def run_automation_async(book_title: str, book_author: str, target_url: st
 
 # PDF extraction functionality removed - using Playwright automation instead
 
+async def extract_text(image_data: str, prompt: str) -> str:
+    """Ask GPT-4 Vision to read the text in a base64 PNG screenshot."""
+    response = await async_client.chat.completions.create(
+        model="gpt-4o",
+        messages=[
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": prompt
+                    },
+                    {
+                        "type": "image_url",
+                        "image_url": {
+                            "url": f"data:image/png;base64,{image_data}"
+                        }
+                    }
+                ]
+            }
+        ],
+        max_tokens=1000,
+        temperature=0.1
+    )
+    return response.choices[0].message.content.strip()
+
+def start_text_extraction_job(image_data: str, prompt: str, sid: str) -> str:
+    """Run extract_text on the shared loop and emit 'ocr_result' to sid when done. Returns the job id."""
+    job_id = uuid.uuid4().hex
+    future = asyncio.run_coroutine_threadsafe(extract_text(image_data, prompt), async_loop)
+    
+    def on_job_done(future):
+        try:
+            text = future.result()
+            logger.info(f"✅ GPT-4 Vision extracted {len(text)} characters for job {job_id}")
+            socketio.emit('ocr_result', {'job_id': job_id, 'text': text}, to=sid)
+        except Exception as e:
+            logger.error(f"❌ Error in text extraction job {job_id}: {str(e)}")
+            socketio.emit('ocr_result', {'job_id': job_id, 'error': str(e), 'text': ''}, to=sid)
+    
+    future.add_done_callback(on_job_done)
+    return job_id
+
 @app.route('/extract-text-from-image', methods=['POST', 'OPTIONS'])
 def extract_text_from_image():
     """Extract text from a screenshot using GPT-4 Vision"""
@@ -785,7 +1504,7 @@ def extract_text_from_image():
     if request.method == 'OPTIONS':
         response = jsonify({})
         response.headers.add('Access-Control-Allow-Origin', '*')
-        response.headers.add('Access-Control-Allow-Headers', 'Content-Type')
+        response.headers.add('Access-Control-Allow-Headers', 'Content-Type, Prefer')
         response.headers.add('Access-Control-Allow-Methods', 'POST')
         return response
     
@@ -799,46 +1518,31 @@ def extract_text_from_image():
         
         # Remove data URL prefix if present
         if image_data.startswith('data:image/'):
-            image_data = image_data.split(',')[1]
-        
-        print(f"📷 Processing screenshot for text extraction...")
-        
-        # Create OpenAI client
-        client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-        
-        # Use GPT-4 Vision to extract text
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": prompt
-                        },
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/png;base64,{image_data}"
-                            }
-                        }
-                    ]
-                }
-            ],
-            max_tokens=1000,
-            temperature=0.1
-        )
+            image_data = image_data.partition(',')[2]
+        
+        logger.info(f"📷 Processing screenshot for text extraction...")
         
-        extracted_text = response.choices[0].message.content.strip()
-        print(f"✅ GPT-4 Vision extracted {len(extracted_text)} characters")
+        # Clients that send "Prefer: respond-async" with their Socket.IO 'sid' get a job id
+        # right away and the text later as an 'ocr_result' event to that sid. Without a sid
+        # the event would be broadcast to every client, so the text is returned over HTTP
+        sid = data.get('sid')
+        if sid and 'respond-async' in request.headers.get('Prefer', ''):
+            job_id = start_text_extraction_job(image_data, prompt, sid)
+            response = jsonify({'job_id': job_id})
+            response.headers.add('Access-Control-Allow-Origin', '*')
+            response.headers.add('Preference-Applied', 'respond-async')
+            return response, 202
+        
+        # Use GPT-4 Vision to extract text, over the shared pooled client
+        extracted_text = run_async(extract_text(image_data, prompt))
+        logger.info(f"✅ GPT-4 Vision extracted {len(extracted_text)} characters")
         
         response = jsonify({'text': extracted_text})
         response.headers.add('Access-Control-Allow-Origin', '*')
         return response
         
     except Exception as e:
-        print(f"❌ Error in text extraction: {str(e)}")
+        logger.error(f"❌ Error in text extraction: {str(e)}")
         response = jsonify({'error': str(e), 'text': ''})
         response.headers.add('Access-Control-Allow-Origin', '*')
         return response, 500
@@ -848,12 +1552,31 @@ if __name__ == '__main__':
     port = int(os.getenv('FLASK_PORT', 5000))
     debug_mode = os.getenv('NODE_ENV') != 'production'
     
-    print("🚀 Starting BookFetcher Python Backend")
-    print(f"📡 Server will be available at: http://localhost:{port}")
-    print(f"🔗 WebSocket endpoint: ws://localhost:{port}")
+    logger.info("🚀 Starting BookFetcher Python Backend")
+    logger.info(f"📡 Server will be available at: http://localhost:{port}")
+    logger.info(f"🔗 WebSocket endpoint: ws://localhost:{port}")
     
     # Check for required environment variables
     if not os.getenv('OPENAI_API_KEY'):
-        print("⚠️  Warning: OPENAI_API_KEY not found in environment")
+        logger.warning("⚠️  OPENAI_API_KEY not found in environment")
+    
+    # pillow-simd keeps Pillow's version number with a .postN suffix
+    pil_version = PIL.__version__
+    if '.post' in pil_version:
+        logger.info(f"🖼️  Using pillow-simd {pil_version}")
+    else:
+        logger.info(f"🖼️  Using Pillow {pil_version} (a pillow-simd build compatible with pillow>=10 would resize covers faster)")
+    
+    # Pre-launch browsers for in-process extractions (only in the serving
+    # process, not the debug reloader's watcher)
+    if not debug_mode or os.getenv('WERKZEUG_RUN_MAIN') == 'true':
+        try:
+            from playwright_book_extractor import close_browser_pool, start_browser_pool
+            pool_size = int(os.getenv('BROWSER_POOL_SIZE', 2))
+            run_async(start_browser_pool(pool_size))
+            atexit.register(lambda: asyncio.run_coroutine_threadsafe(close_browser_pool(), async_loop).result(timeout=5))
+            logger.info(f"🌐 Browser pool ready: {pool_size} Chromium instances")
+        except Exception as e:
+            logger.warning(f"⚠️  Browser pool not started, the first extraction will launch a shared browser: {e}")
     
     socketio.run(app, host='0.0.0.0', port=port, debug=debug_mode, allow_unsafe_werkzeug=True) 
\ No newline at end of file
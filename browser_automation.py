@@ -15,43 +15,8 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
-async def automate_book_extraction(book_title: str, book_author: str, preview_url: str = None, callback_url: str = None):
-    """
-    Use browser-use to automate book content extraction from Google Books preview.
-    
-    Args:
-        book_title: Title of the book to search for
-        book_author: Author of the book
-        preview_url: Direct URL to Google Books preview page
-        callback_url: Optional URL to send progress updates to
-    """
-    
-    # Send progress update function (defined outside try block for proper scope)
-    def send_progress(step_id: str, description: str, status: str, url: str = None):
-        progress = {
-            "step_id": step_id,
-            "description": description,
-            "status": status,
-            "url": url,
-            "timestamp": datetime.now().isoformat()
-        }
-        print(f"PROGRESS:{json.dumps(progress)}")
-        sys.stdout.flush()
-    
-    try:
-        # Import browser-use (will be installed separately)
-        from browser_use import Agent
-        from browser_use.llm import ChatOpenAI
-        
-        # Create screenshots directory
-        screenshots_dir = os.path.abspath("temp/screenshots")
-        os.makedirs(screenshots_dir, exist_ok=True)
-        send_progress("screenshots", f"📂 Screenshots directory created: {screenshots_dir}", "completed")
-        
-        # Use the provided preview URL, or fallback to Archive.org search
-        if preview_url:
-            target_url = preview_url
-            task = f"""
+# Agent task prompts, built once at import and filled in per extraction
+GOOGLE_BOOKS_TASK_TEMPLATE = """
             Extract book pages from Google Books by saving page images directly using right-click.
 
             STEP-BY-STEP PROCESS:
@@ -83,12 +48,8 @@ async def automate_book_extraction(book_title: str, book_author: str, preview_ur
             After saving all pages, return a summary like:
             "Successfully saved 6 pages as images to the screenshots directory."
             """
-        else:
-            # Fallback to Archive.org search if no preview URL provided
-            encoded_title = quote(f"({book_title})")
-            encoded_author = quote(f"({book_author})")
-            target_url = f"https://archive.org/search?query=title%3A{encoded_title}%20AND%20creator%3A{encoded_author}"
-            task = f"""
+
+ARCHIVE_TASK_TEMPLATE = """
             Follow these steps to extract book content from Archive.org:
 
             1. Go directly to this search URL: {target_url}
@@ -102,6 +63,50 @@ async def automate_book_extraction(book_title: str, book_author: str, preview_ur
             Important: Always choose the book version with the most stars for the best quality content.
             Return the extracted text from all pages in a clear format.
             """
+
+async def automate_book_extraction(book_title: str, book_author: str, preview_url: str = None, callback_url: str = None):
+    """
+    Use browser-use to automate book content extraction from Google Books preview.
+    
+    Args:
+        book_title: Title of the book to search for
+        book_author: Author of the book
+        preview_url: Direct URL to Google Books preview page
+        callback_url: Optional URL to send progress updates to
+    """
+    
+    # Send progress update function (defined outside try block for proper scope)
+    def send_progress(step_id: str, description: str, status: str, url: str = None):
+        progress = {
+            "step_id": step_id,
+            "description": description,
+            "status": status,
+            "url": url,
+            "timestamp": datetime.now().isoformat()
+        }
+        print(f"PROGRESS:{json.dumps(progress)}")
+        sys.stdout.flush()
+    
+    try:
+        # Import browser-use (will be installed separately)
+        from browser_use import Agent
+        from browser_use.llm import ChatOpenAI
+        
+        # Create screenshots directory
+        screenshots_dir = os.path.abspath("temp/screenshots")
+        os.makedirs(screenshots_dir, exist_ok=True)
+        send_progress("screenshots", f"📂 Screenshots directory created: {screenshots_dir}", "completed")
+        
+        # Use the provided preview URL, or fallback to Archive.org search
+        if preview_url:
+            target_url = preview_url
+            task = GOOGLE_BOOKS_TASK_TEMPLATE.format(target_url=target_url, screenshots_dir=screenshots_dir)
+        else:
+            # Fallback to Archive.org search if no preview URL provided
+            encoded_title = quote(f"({book_title})")
+            encoded_author = quote(f"({book_author})")
+            target_url = f"https://archive.org/search?query=title%3A{encoded_title}%20AND%20creator%3A{encoded_author}"
+            task = ARCHIVE_TASK_TEMPLATE.format(target_url=target_url, book_title=book_title, book_author=book_author)
         
         # Initialize progress tracking
         send_progress("step1", "🌐 Initializing browser automation", "running")
@@ -132,7 +137,12 @@ async def automate_book_extraction(book_title: str, book_author: str, preview_ur
         send_progress("step3", "📖 Content extraction completed", "completed")
         
         # Check for saved screenshots
-        screenshot_files = [f for f in os.listdir(screenshots_dir) if f.startswith("page_") and f.endswith(".png")]
+        # Numeric order so page_10.png follows page_9.png
+        with os.scandir(screenshots_dir) as entries:
+            screenshot_files = sorted(
+                (e.name for e in entries if e.name.startswith("page_") and e.name.endswith(".png") and e.name[5:-4].isdigit()),
+                key=lambda name: int(name[5:-4])
+            )
         screenshot_count = len(screenshot_files)
         
         if screenshot_count > 0:
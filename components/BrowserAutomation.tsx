@@ -41,6 +41,8 @@ export default function BrowserAutomation({
   const [selectedPageContent, setSelectedPageContent] = useState<SelectedPageContent | null>(null)
 
   const iframeRef = useRef<HTMLIFrameElement>(null)
+  // Oversized content sections arrive as content_chunk pieces, collected here by section_index
+  const contentChunksRef = useRef<Record<number, { parts: Record<number, string>; received: number }>>({})
 
   useEffect(() => {
     if (!isVisible) return
@@ -66,6 +68,8 @@ export default function BrowserAutomation({
     newSocket.on('automation_progress', handleProgressEvent)
     newSocket.on('automation_complete', handleCompletionEvent)
     newSocket.on('automation_error', handleErrorEvent)
+    newSocket.on('content_extracted', handleContentExtracted)
+    newSocket.on('content_chunk', handleContentChunk)
 
     return () => {
       newSocket.disconnect()
@@ -97,7 +101,36 @@ export default function BrowserAutomation({
     
     // Update screenshot state
     if (event.screenshot) {
-      setCurrentScreenshot(event.screenshot)
+      // Screenshots arrive as /screenshot/... URLs (or inline data URLs as a fallback)
+      setCurrentScreenshot(
+        event.screenshot.startsWith('data:') ? event.screenshot : getApiUrl(event.screenshot)
+      )
+    }
+  }
+
+  const handleContentExtracted = (event: any) => {
+    if (event.content_sections?.length) {
+      setExtractedContent(prev => [...prev, ...event.content_sections])
+    }
+  }
+
+  const handleContentChunk = (event: any) => {
+    const chunks = contentChunksRef.current
+    const section = chunks[event.section_index] || (chunks[event.section_index] = { parts: {}, received: 0 })
+    if (section.parts[event.offset] === undefined) {
+      section.parts[event.offset] = event.text
+      section.received += event.text.length
+    }
+    
+    // Reassemble once every piece of the section has arrived
+    if (section.received >= event.total_length) {
+      const text = Object.keys(section.parts)
+        .map(Number)
+        .sort((a, b) => a - b)
+        .map(offset => section.parts[offset])
+        .join('')
+      delete chunks[event.section_index]
+      setExtractedContent(prev => [...prev, text])
     }
   }
 
@@ -27,7 +27,7 @@ elif [[ "$OSTYPE" == "linux-gnu"* ]]; then
     
     # Install Tesseract OCR
     echo "📦 Installing Tesseract OCR engine..."
-    sudo apt install -y tesseract-ocr tesseract-ocr-eng
+    sudo apt install -y tesseract-ocr tesseract-ocr-eng libtesseract-dev libleptonica-dev
     
     echo "✅ Tesseract OCR installed successfully!"
     
@@ -42,7 +42,7 @@ fi
 
 echo ""
 echo "🐍 Installing Python dependencies..."
-pip install pytesseract Pillow openai python-dotenv
+pip install tesserocr Pillow openai python-dotenv
 
 echo ""
 echo "✅ All OCR dependencies installed successfully!"
@@ -51,4 +51,4 @@ echo "🔑 Don't forget to set your OpenAI API key in .env file:"
 echo "   OPENAI_API_KEY=your_api_key_here"
 echo ""
 echo "🧪 Test OCR installation:"
-echo "   python -c \"import pytesseract; print('OCR ready!')\"" 
\ No newline at end of file
+echo "   python -c \"import tesserocr; print('OCR ready!')\"" 
\ No newline at end of file
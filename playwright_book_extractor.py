@@ -4,81 +4,242 @@ Playwright-based book page extractor for Google Books preview pages.
 """
 
 import asyncio
+import atexit
+import concurrent.futures
+import multiprocessing
+from concurrent.futures.process import BrokenProcessPool
+import contextlib
+import contextvars
+import functools
+import hashlib
+import logging
 import os
 import sys
+import threading
 import base64
+import io
 from pathlib import Path
-from playwright.async_api import async_playwright
-import json
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError, async_playwright
+import orjson
+import re
+from collections import deque
 from datetime import datetime
-import pytesseract
-from PIL import Image
+import numpy as np
+import imagehash
+from PIL import Image, ImageOps
 import openai
+import diskcache
 from dotenv import load_dotenv
-import concurrent.futures
 import time
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
+if TYPE_CHECKING:
+    from tesserocr import PyTessBaseAPI
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+try:
+    import re2
+except ImportError:
+    re2 = None
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+try:
+    import easyocr
+    import torch
+except ImportError:
+    # Optional GPU OCR; pages go through tesseract without it
+    easyocr = None
 
 # Load environment variables
 load_dotenv()
 
+# Inside the backend this propagates to its queued 'bookfetcher' handler
+logger = logging.getLogger('bookfetcher.extractor')
+
 # Initialize OpenAI client
-openai_client = openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+# Async client, so multi-second GPT-4 calls wait on the event loop instead of holding a worker thread
+openai_client = openai.AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+
+# GPT-4 page analyses keyed by a hash of the page summaries, so retries and
+# repeated early-stop checks over the same pages skip the API call
+GPT_CACHE_DIR = os.path.abspath(
+    os.getenv('GPT_CACHE_DIR')
+    or os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'gpt4_book_analysis')
+)
+GPT_CACHE_SIZE_LIMIT = 64 * 1024 * 1024
+GPT_CACHE_EXPIRE_SECONDS = 7 * 24 * 3600
+
+_gpt_cache = None
+_gpt_cache_lock = threading.Lock()
+
+def get_gpt_cache() -> diskcache.Cache:
+    """Open the GPT-4 analysis cache on first use. Blocking; call it with asyncio.to_thread"""
+    global _gpt_cache
+    with _gpt_cache_lock:
+        if _gpt_cache is None:
+            _gpt_cache = diskcache.Cache(GPT_CACHE_DIR, size_limit=GPT_CACHE_SIZE_LIMIT)
+    return _gpt_cache
+
+def cached_analysis(key: str) -> Optional[dict]:
+    return get_gpt_cache().get(key)
 
-def extract_text_from_image(image_path: str) -> str:
-    """Extract text from image using OCR with noise filtering"""
+def store_analysis(key: str, analysis: dict):
+    get_gpt_cache().set(key, analysis, expire=GPT_CACHE_EXPIRE_SECONDS)
+
+# Set when the extractor runs inside the backend process; otherwise progress
+# is written to stdout as PROGRESS: lines for the parent process to parse
+progress_callback = contextvars.ContextVar('progress_callback', default=None)
+
+def write_protocol_line(prefix: bytes, payload: dict):
+    """Write a PROGRESS:/RESULT: line as UTF-8 bytes straight to stdout"""
+    # Flush pending log output first so lines keep their order
+    sys.stdout.flush()
+    sys.stdout.buffer.write(prefix + orjson.dumps(payload) + b'\n')
+    sys.stdout.buffer.flush()
+
+def report_progress(progress: dict):
+    """Send a progress update to the backend"""
+    callback = progress_callback.get()
+    if callback:
+        callback(progress)
+    else:
+        write_protocol_line(b'PROGRESS:', progress)
+
+def emit_progress(step_id: str, description: str, status: str = 'running', **extra):
+    """Report a progress step, with any extra fields such as a screenshot"""
+    report_progress({'step_id': step_id, 'description': description, 'status': status, **extra})
+
+# RE2 matches in linear time without backtracking; both line filters are RE2-compatible
+_line_re = re2 if re2 is not None else re
+# Lines that look like base64 or random encoding artifacts
+_B64_RE = _line_re.compile(r'^[A-Za-z0-9+/=]{20,}$')
+# Lines that are mostly numbers/symbols
+_SYM_RE = _line_re.compile(r'^[0-9\s\-_+=.,;:!@#$%^&*()]{5,}$')
+# Common Google Books artifacts and watermarks
+GOOGLE_ARTIFACTS = [
+    'ogle Books',
+    'nd enjoy eslr access to your favor estos',
+    'Powered by Google Books API',
+    'This downloads and extracts text from Google Books PDF previews'
+]
+if ahocorasick is not None:
+    # One automaton pass per line finds any artifact, however long the list grows
+    _ARTIFACT_AC = ahocorasick.Automaton()
+    for artifact in GOOGLE_ARTIFACTS:
+        _ARTIFACT_AC.add_word(artifact, artifact)
+    _ARTIFACT_AC.make_automaton()
+    
+    def has_google_artifact(line: str) -> bool:
+        return next(_ARTIFACT_AC.iter(line), None) is not None
+else:
+    _ARTIFACT_RE = re.compile('|'.join(map(re.escape, GOOGLE_ARTIFACTS)))
+    
+    def has_google_artifact(line: str) -> bool:
+        return _ARTIFACT_RE.search(line) is not None
+
+# Headings and boilerplate that mark a page as front matter rather than book content
+FRONT_MATTER_RE = re.compile(
+    r'\b(copyright|isbn|all rights reserved|table of contents|acknowledge?ments|dedication|'
+    r'foreword|preface|introduction|also by|praise for)\b',
+    re.IGNORECASE
+)
+SENTENCE_BREAK_RE = re.compile(r'[.!?]\s+[A-Z]')
+
+def heuristic_content_page(text: str) -> Optional[bool]:
+    """Guess whether a page is book content: False for front matter, True for running prose, None when unclear"""
+    if len(text) < 50 or FRONT_MATTER_RE.search(text):
+        return False
+    if len(SENTENCE_BREAK_RE.findall(text)) >= 3:
+        return True
+    return None
+
+if njit is not None:
+    @njit(nogil=True, cache=True)
+    def _ascii_readable_ratio(b: np.ndarray) -> float:
+        """Share of ASCII bytes that str.isalnum() or str.isspace() accepts (1.0 for an empty line)"""
+        n = b.shape[0]
+        count = 0
+        for i in range(n):
+            x = b[i]
+            if (48 <= x <= 57) or (65 <= x <= 90) or (97 <= x <= 122) or (9 <= x <= 13) or (28 <= x <= 32):
+                count += 1
+        return count / n if n else 1.0
+else:
+    def _ascii_readable_ratio(b: np.ndarray) -> float:
+        """Share of ASCII bytes that str.isalnum() or str.isspace() accepts (1.0 for an empty line)"""
+        if not b.size:
+            return 1.0
+        readable = ((b >= 48) & (b <= 57)) | ((b >= 65) & (b <= 90)) | ((b >= 97) & (b <= 122)) | ((b >= 9) & (b <= 13)) | ((b >= 28) & (b <= 32))
+        return readable.sum() / b.size
+
+def readable_ratio(line: str) -> float:
+    """Share of characters in line that are letters, digits or whitespace"""
+    if line.isascii():
+        return _ascii_readable_ratio(np.frombuffer(line.encode('ascii'), np.uint8))
+    # Symbol junk like "■□◆" or "»«§©" is non-ASCII, so score it character by character
+    return sum(1 for c in line if c.isalnum() or c.isspace()) / len(line) if line else 1.0
+
+def otsu_threshold(pixels: np.ndarray) -> int:
+    """Grey level that best splits an 8-bit image into background and foreground"""
+    hist = np.bincount(pixels.ravel(), minlength=256).astype(np.float64)
+    below = np.cumsum(hist)[:-1]  # Pixel count at or below each candidate level
+    below_sum = np.cumsum(hist * np.arange(256))[:-1]
+    total, total_sum = hist.sum(), (hist * np.arange(256)).sum()
+    above = total - below
+    # Between-class variance, up to a constant factor
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variance = (total_sum * below - total * below_sum) ** 2 / (below * above)
+    return int(np.argmax(np.nan_to_num(variance, nan=0.0, posinf=0.0)))
+
+def extract_text_from_image(api: 'PyTessBaseAPI', image_bytes: bytes) -> str:
+    """Extract text from screenshot bytes using OCR with noise filtering"""
     try:
-        image = Image.open(image_path)
-        text = pytesseract.image_to_string(image)
+        with Image.open(io.BytesIO(image_bytes)) as image:
+            # Screenshots are captured at 2x; grayscale capped at 1600px still reads cleanly with far fewer pixels.
+            # For JPEG captures, draft lets libjpeg decode straight to grayscale at a reduced scale
+            image.draft('L', (1600, 1600))
+            image = image.convert('L')
+        # Past roughly 300 DPI tesseract gains no accuracy, only runtime
+        image.thumbnail((1600, 1600), Image.LANCZOS)
+        pixels = np.asarray(ImageOps.autocontrast(image))
+        # Binarize at the Otsu threshold so tesseract sees clean black text on white
+        binary = np.where(pixels > otsu_threshold(pixels), 255, 0).astype(np.uint8)
+        api.SetImage(Image.fromarray(binary))
+        text = api.GetUTF8Text()
         
         # Clean OCR artifacts and noise
         cleaned_text = clean_ocr_text(text)
         return cleaned_text.strip()
     except Exception as e:
-        print(f"OCR error for {image_path}: {e}")
+        logger.error(f"OCR error: {e}")
         return ""
 
 def clean_ocr_text(text: str) -> str:
     """Remove OCR artifacts, noise, and non-book content"""
-    import re
-    
-    lines = text.split('\n')
     cleaned_lines = []
     
-    for line in lines:
+    for line in text.split('\n'):
         line = line.strip()
         
-        # Skip empty lines
-        if not line:
+        # Skip empty lines and very short lines that are likely artifacts
+        if len(line) < 3:
             continue
             
-        # Remove lines that look like base64 or random encoding artifacts
-        if re.match(r'^[A-Za-z0-9+/=]{20,}$', line):
+        if _B64_RE.match(line):
             continue
             
         # Remove lines with mostly random characters (low readability)
         if len(line) > 10:
-            readable_chars = sum(1 for c in line if c.isalnum() or c.isspace())
-            if readable_chars / len(line) < 0.7:  # Less than 70% readable characters
+            if readable_ratio(line) < 0.7:  # Less than 70% readable characters
                 continue
-        
-        # Remove very short lines that are likely artifacts
-        if len(line) < 3:
-            continue
             
-        # Remove lines that are mostly numbers/symbols
-        if re.match(r'^[0-9\s\-_+=.,;:!@#$%^&*()]{5,}$', line):
+        if _SYM_RE.match(line):
             continue
             
-        # Remove common Google Books artifacts and watermarks
-        google_artifacts = [
-            'ogle Books',
-            'nd enjoy eslr access to your favor estos',
-            'Powered by Google Books API',
-            'This downloads and extracts text from Google Books PDF previews'
-        ]
-        
-        if any(artifact in line for artifact in google_artifacts):
+        if has_google_artifact(line):
             continue
             
         # Keep lines that look like actual text
@@ -86,77 +247,245 @@ def clean_ocr_text(text: str) -> str:
     
     return '\n'.join(cleaned_lines)
 
+# Write every captured page to the screenshots directory, not just the selected one
+SAVE_PAGE_SCREENSHOTS = os.getenv('SAVE_PAGE_SCREENSHOTS') == 'true'
+
+def save_page_image(screenshots_dir: str, filename: str, image_bytes: bytes):
+    """Write a captured page into the screenshots directory as an 8-bit grayscale PNG"""
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        # Fastest zlib level: these are short-lived debug and preview files, not archives
+        image.convert('L').save(os.path.join(screenshots_dir, filename), compress_level=1)
+
+def page_result(page_num: int, text: str) -> dict:
+    """Result entry for a page whose text has been read"""
+    return {
+        "page_number": page_num,
+        "filename": f"page_{page_num}.png",
+        "text": text,
+        "text_length": len(text),
+        "content_hint": heuristic_content_page(text)
+    }
+
+# Tesseract handle owned by each OCR worker process, loaded once per worker
+_ocr_api = None
+
+def _init_ocr_worker():
+    global _ocr_api
+    # Pages already run in parallel worker processes, so keep tesseract's own OpenMP
+    # threads from competing for the same cores. OpenMP reads this when libtesseract
+    # loads, which is why tesserocr is only imported here, inside the worker
+    os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+    from tesserocr import OEM, PSM, PyTessBaseAPI
+    # LSTM-only skips loading the legacy engine's models and classifier
+    _ocr_api = PyTessBaseAPI(lang='eng', psm=PSM.SINGLE_BLOCK, oem=OEM.LSTM_ONLY)
+
+def _ocr_worker(image_bytes: bytes, page_num: int) -> dict:
+    """OCR one page screenshot inside a pool worker"""
+    return page_result(page_num, extract_text_from_image(_ocr_api, image_bytes))
+
+# OCR is CPU-bound, so pages are recognized in separate processes rather than threads.
+# Created on first use and replaced if a worker dies, which breaks the whole pool
+_ocr_pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+_ocr_pool_lock = threading.Lock()
+
+def get_ocr_pool() -> concurrent.futures.ProcessPoolExecutor:
+    """Return the shared OCR process pool, starting a new one if needed"""
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is None:
+            # The backend process is multi-threaded, so fork workers from a clean
+            # forkserver rather than the backend itself; preloading only this module
+            # keeps the forkserver from importing (and starting threads in) the backend
+            context = multiprocessing.get_context('forkserver')
+            context.set_forkserver_preload([__name__])
+            _ocr_pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=os.cpu_count(),
+                mp_context=context,
+                initializer=_init_ocr_worker
+            )
+        return _ocr_pool
+
+def discard_ocr_pool(pool: concurrent.futures.ProcessPoolExecutor):
+    """Drop a broken OCR pool so the next page starts a fresh one"""
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is pool:
+            _ocr_pool = None
+    pool.shutdown(wait=False)
+
+def shutdown_ocr_pool():
+    if _ocr_pool is not None:
+        _ocr_pool.shutdown()
+
+atexit.register(shutdown_ocr_pool)
+
+def submit_ocr(image_bytes: bytes, page_num: int) -> asyncio.Future:
+    """Queue one page for OCR in the process pool, replacing the pool if it has broken"""
+    loop = asyncio.get_running_loop()
+    pool = get_ocr_pool()
+    try:
+        future = loop.run_in_executor(pool, _ocr_worker, image_bytes, page_num)
+    except BrokenProcessPool:
+        logger.warning("⚠️ OCR worker pool broke, starting a new one")
+        discard_ocr_pool(pool)
+        pool = get_ocr_pool()
+        future = loop.run_in_executor(pool, _ocr_worker, image_bytes, page_num)
+    # A worker crash (e.g. a tesseract segfault) fails this job and every later submit
+    future.add_done_callback(functools.partial(discard_pool_if_broken, pool))
+    return future
+
+def discard_pool_if_broken(pool: concurrent.futures.ProcessPoolExecutor, future):
+    if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+        discard_ocr_pool(pool)
+
+def record_ocr_result(completed_results: Dict[int, dict], future):
+    """Done-callback storing a finished OCR job under its page number"""
+    if not future.cancelled() and future.exception() is None:
+        result = future.result()
+        completed_results[result['page_number']] = result
+
+def leading_pages(completed_results: Dict[int, dict]) -> List[dict]:
+    """OCR'd pages running without a gap from page 1, so page numbering stays intact"""
+    pages = []
+    while len(pages) + 1 in completed_results:
+        pages.append(completed_results[len(pages) + 1])
+    return pages
+
+async def collect_ocr_results(ocr_futures: list) -> List[dict]:
+    """Wait for submitted OCR jobs and return the successful pages in page order"""
+    page_contents = []
+    # Jobs cancelled by an early stop are for pages that were discarded
+    pending = [future for future in ocr_futures if not future.cancelled()]
+    for i, result in enumerate(await asyncio.gather(*pending, return_exceptions=True)):
+        if isinstance(result, Exception):
+            logger.error(f"❌ OCR failed for task {i+1}: {result}")
+            continue
+        page_contents.append(result)
+    page_contents.sort(key=lambda x: x['page_number'])
+    return page_contents
+
+# Size every page is resized to so a whole book fits one EasyOCR batch
+EASYOCR_PAGE_SIZE = (1000, 1080)
+
+_easy_reader = None
+_easy_reader_lock = threading.Lock()
+# Model loading and batches run for seconds on a single GPU, so they get their own thread
+# rather than tying up the loop's default executor used for short file and hashing work
+_easyocr_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='easyocr')
+atexit.register(_easyocr_executor.shutdown, wait=False)
+
+def get_easy_reader():
+    """Return the shared GPU EasyOCR reader, or None when EasyOCR or a CUDA device is unavailable"""
+    global _easy_reader
+    if easyocr is None or not torch.cuda.is_available():
+        return None
+    with _easy_reader_lock:
+        if _easy_reader is None:
+            n_width, n_height = EASYOCR_PAGE_SIZE
+            try:
+                reader = easyocr.Reader(['en'], gpu=True, cudnn_benchmark=True)
+                # The first batch pays for cuDNN autotuning, so spend it on a blank page
+                reader.readtext_batched([np.zeros((n_height, n_width, 3), dtype=np.uint8)], n_width=n_width, n_height=n_height)
+            except Exception as e:
+                logger.warning(f"⚠️ EasyOCR unavailable, falling back to tesseract: {e}")
+                return None
+            _easy_reader = reader
+    return _easy_reader
+
+def easyocr_batch(reader, images: Dict[int, bytes]) -> List[dict]:
+    """Recognize several page screenshots in one batched GPU pass"""
+    page_nums = sorted(images)
+    n_width, n_height = EASYOCR_PAGE_SIZE
+    batch_lines = reader.readtext_batched(
+        [images[page_num] for page_num in page_nums],
+        n_width=n_width,
+        n_height=n_height,
+        batch_size=len(page_nums),
+        detail=0
+    )
+    
+    page_results = []
+    for page_num, lines in zip(page_nums, batch_lines):
+        page_results.append(page_result(page_num, clean_ocr_text('\n'.join(lines)).strip()))
+    return page_results
+
+async def recognize_pending_pages(reader, page_images: Dict[int, bytes], completed_results: Dict[int, dict]):
+    """Batch-OCR every captured page that has no result yet"""
+    pending = {page_num: image for page_num, image in page_images.items() if page_num not in completed_results}
+    if not pending:
+        return
+    try:
+        batch = await asyncio.get_running_loop().run_in_executor(_easyocr_executor, easyocr_batch, reader, pending)
+        for result in batch:
+            completed_results[result['page_number']] = result
+    except Exception as e:
+        logger.error(f"❌ Batched OCR failed for pages {sorted(pending)}: {e}")
+
+# Characters of each page sent to GPT-4; the opening is enough to tell front matter from content
+GPT_PREVIEW_CHARS = 150
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Fixed instructions, kept ahead of the per-book pages so the prompt prefix is identical across calls
+GPT_SYSTEM_PROMPT = """You are a book analysis expert. The user sends a JSON array of extracted book pages as {"p": page number, "len": full text length, "t": opening text}.
+
+1. Identify which pages contain ACTUAL STORY CONTENT (not title pages, copyright, table of contents, forewords, introductions, etc.)
+2. Classify the book as fiction or non-fiction
+3. Select the appropriate page based on these rules:
+   - If NON-FICTION: return the 1st actual content page
+   - If FICTION: return the 2nd actual content page (or 1st if only one exists)
+
+Respond with a single JSON object in this exact format:
+{"classification": "fiction" or "non-fiction", "content_pages": [page numbers with actual story/content, not front matter], "selected_page": page number to return based on the rules, "reasoning": "one short sentence explaining your selections"}"""
+
 async def analyze_book_with_gpt4(all_pages: list) -> dict:
     """Use GPT-4 to analyze all pages and select the appropriate content page"""
     try:
-        # Prepare pages data for GPT-4
+        # Compact JSON page list with whitespace collapsed, to keep input tokens down
         pages_summary = []
         for i, page_info in enumerate(all_pages, 1):
             text = page_info["text"]
-            # Truncate very long pages for the summary
-            preview_text = text[:400] + "..." if len(text) > 400 else text
-            pages_summary.append(f"Page {i}: {len(text)} characters\n{preview_text}")
+            preview_text = _WHITESPACE_RE.sub(' ', text[:GPT_PREVIEW_CHARS * 2]).strip()[:GPT_PREVIEW_CHARS]
+            pages_summary.append({'p': page_info.get('page_number', i), 'len': len(text), 't': preview_text})
         
-        pages_text = "\n\n---\n\n".join(pages_summary)
+        pages_text = orjson.dumps(pages_summary).decode()
         
-        prompt = f"""
-        You are analyzing a book with {len(all_pages)} extracted pages. Your task is to:
-
-        1. Identify which pages contain ACTUAL STORY CONTENT (not title pages, copyright, table of contents, forewords, introductions, etc.)
-        2. Classify the book as fiction or non-fiction
-        3. Select the appropriate page based on these rules:
-           - If NON-FICTION: return the 1st actual content page
-           - If FICTION: return the 2nd actual content page (or 1st if only one exists)
-
-        Here are all the pages:
-
-        {pages_text}
-
-        Respond with ONLY a JSON object in this exact format:
-        {{
-            "classification": "fiction" or "non-fiction",
-            "content_pages": [list of page numbers that contain actual story/content, not front matter],
-            "selected_page": page number to return based on the rules,
-            "reasoning": "brief explanation of your selections"
-        }}
-        """
+        cache_key = hashlib.sha256(pages_text.encode()).hexdigest()
+        # diskcache is sqlite underneath, so keep its reads and writes off the event loop
+        cached = await asyncio.to_thread(cached_analysis, cache_key)
+        if cached is not None:
+            logger.info(f"💾 Using cached GPT-4 analysis for {len(all_pages)} pages")
+            return cached
         
-        response = openai_client.chat.completions.create(
+        response = await openai_client.chat.completions.create(
             model="gpt-4o",
             messages=[
-                {"role": "system", "content": "You are a book analysis expert. Respond only with valid JSON."},
-                {"role": "user", "content": prompt}
+                {"role": "system", "content": GPT_SYSTEM_PROMPT},
+                {"role": "user", "content": pages_text}
             ],
-            max_tokens=200,
-            temperature=0
+            # Room for a long content_pages list plus reasoning; JSON mode cut short is invalid JSON
+            max_tokens=512,
+            temperature=0,
+            response_format={"type": "json_object"}
         )
         
-        result_text = response.choices[0].message.content.strip()
-        
-        # Clean up the response - remove markdown code blocks if present
-        if result_text.startswith('```json'):
-            result_text = result_text[7:]  # Remove ```json
-        if result_text.startswith('```'):
-            result_text = result_text[3:]   # Remove ```
-        if result_text.endswith('```'):
-            result_text = result_text[:-3]  # Remove closing ```
-        
-        result_text = result_text.strip()
+        choice = response.choices[0]
+        if choice.finish_reason == 'length':
+            raise ValueError("response hit max_tokens before the JSON object was complete")
+        # JSON mode guarantees a bare JSON object, no code fences to strip
+        result = orjson.loads(choice.message.content)
         
-        # Parse JSON response
-        import json as json_lib
-        result = json_lib.loads(result_text)
-        
-        return {
+        analysis = {
             "classification": result.get("classification", "unknown"),
             "content_pages": result.get("content_pages", []),
             "selected_page": result.get("selected_page", None),
             "reasoning": result.get("reasoning", ""),
             "confidence": "high"
         }
+        await asyncio.to_thread(store_analysis, cache_key, analysis)
+        return analysis
         
     except Exception as e:
-        print(f"GPT-4 analysis error: {e}")
+        logger.error(f"GPT-4 analysis error: {e}")
         return {
             "classification": "unknown",
             "content_pages": [],
@@ -165,25 +494,316 @@ async def analyze_book_with_gpt4(all_pages: list) -> dict:
             "confidence": "low"
         }
 
+def early_stop_target(analysis: dict):
+    """Classification and the page to stop at for a GPT-4 analysis (None until enough content pages are seen)"""
+    classification = analysis.get("classification", "unknown")
+    content_pages = analysis.get("content_pages", [])
+    
+    # Check if we have the required page
+    if classification == "fiction" and len(content_pages) >= 2:
+        return classification, content_pages[1]  # 2nd content page for fiction
+    if classification == "non-fiction" and len(content_pages) >= 1:
+        return classification, content_pages[0]  # 1st content page for non-fiction
+    return classification, None
+
+def jpeg_data_url(image_bytes: bytes) -> str:
+    """Encode JPEG bytes as a data URL"""
+    return f"data:image/jpeg;base64,{base64.b64encode(image_bytes).decode('utf-8')}"
+
 async def send_screenshot_update(page, step_id: str, description: str):
     """Send a screenshot update to the frontend"""
     try:
-        # Take screenshot and convert to base64
-        screenshot_bytes = await page.screenshot(full_page=False)
-        screenshot_base64 = base64.b64encode(screenshot_bytes).decode('utf-8')
-        
-        print(f"PROGRESS:{json.dumps({
-            'step_id': step_id,
-            'description': description,
-            'status': 'running',
-            'screenshot': f'data:image/png;base64,{screenshot_base64}'
-        })}")
+        # Lossy JPEG is plenty for a UI preview and far smaller than PNG
+        screenshot_bytes = await page.screenshot(full_page=False, type='jpeg', quality=60)
+        screenshot = await asyncio.to_thread(jpeg_data_url, screenshot_bytes)
+        if progress_callback.get():
+            # The backend callback writes a file and emits over Socket.IO, so keep it off the event loop
+            await asyncio.to_thread(emit_progress, step_id, description, screenshot=screenshot)
+        else:
+            # PROGRESS: lines must be written from the thread that logs, or they can interleave
+            emit_progress(step_id, description, screenshot=screenshot)
     except Exception as e:
-        print(f"PROGRESS:{json.dumps({
-            'step_id': step_id,
-            'description': f'{description} (screenshot failed)',
-            'status': 'running'
-        })}")
+        emit_progress(step_id, f'{description} (screenshot failed)')
+
+class BrowserPool:
+    """Pre-launched Chromium instances handed out to extractions in a long-lived process"""
+    
+    def __init__(self, size: int = 2):
+        self.size = size
+        self._playwright = None
+        self._browsers = None
+    
+    async def start(self):
+        self._playwright = await async_playwright().start()
+        self._browsers = asyncio.Queue()
+        for _ in range(self.size):
+            self._browsers.put_nowait(await self._launch())
+    
+    async def _launch(self):
+        # Launch browser in headless mode to avoid separate window
+        return await self._playwright.chromium.launch(headless=True)
+    
+    async def get(self):
+        browser = await self._browsers.get()
+        if not browser.is_connected():
+            # Replace browsers that crashed while idle or during the last run
+            browser = await self._launch()
+        return browser
+    
+    def put(self, browser):
+        self._browsers.put_nowait(browser)
+    
+    async def close(self):
+        while not self._browsers.empty():
+            browser = self._browsers.get_nowait()
+            if browser.is_connected():
+                await browser.close()
+        await self._playwright.stop()
+
+# Started by the backend at startup, or lazily with a single browser on first use
+browser_pool: Optional[BrowserPool] = None
+_browser_pool_starting: Optional[asyncio.Future] = None
+
+async def start_browser_pool(size: int = 2):
+    """Launch the shared browser pool used by later extractions"""
+    global browser_pool
+    pool = BrowserPool(size)
+    await pool.start()
+    browser_pool = pool
+
+async def get_browser_pool() -> BrowserPool:
+    """Return the shared browser pool, launching a one-browser pool if none was started"""
+    global _browser_pool_starting
+    if browser_pool is None:
+        # Concurrent first callers wait on the same launch
+        if _browser_pool_starting is None:
+            _browser_pool_starting = asyncio.ensure_future(start_browser_pool(1))
+        try:
+            await asyncio.shield(_browser_pool_starting)
+        finally:
+            _browser_pool_starting = None
+    return browser_pool
+
+async def close_browser_pool():
+    """Close the pooled browsers and stop Playwright"""
+    global browser_pool
+    if browser_pool is not None:
+        pool, browser_pool = browser_pool, None
+        await pool.close()
+
+@contextlib.asynccontextmanager
+async def acquire_browser():
+    """Yield a browser from the shared pool, returning it for the next extraction"""
+    pool = await get_browser_pool()
+    browser = await pool.get()
+    try:
+        yield browser
+    finally:
+        pool.put(browser)
+
+# Requests that never affect the rendered page images, aborted to speed up loading.
+# Only these URLs are routed, so everything else skips interception and keeps the HTTP cache
+BLOCKED_FONT_MEDIA_RE = re.compile(r'\.(?:woff2?|ttf|otf|eot|mp4|webm|ogg|mp3|m4a|wav)(?:[?#]|$)', re.IGNORECASE)
+BLOCKED_TRACKER_RE = re.compile(r'^https?://[^/]*(?:doubleclick\.net|google-analytics\.com|googletagmanager\.com)/|/analytics')
+
+async def abort_request(route):
+    """Abort a routed font, media or tracker request"""
+    await route.abort()
+
+# Clicks up to two cookie/popup dismiss controls; returns how many were clicked
+DISMISS_POPUPS_JS = '''() => {
+    const dismissTexts = ['no thanks', 'got it', 'accept'];
+    const buttons = [...document.querySelectorAll('button, [aria-label*="close"], .modal-close')].filter(el =>
+        el.matches('[aria-label*="close"], .modal-close') ||
+        dismissTexts.some(text => el.textContent.toLowerCase().includes(text))
+    );
+    buttons.slice(0, 2).forEach(el => el.click());  // Close first 2 popups max
+    return Math.min(buttons.length, 2);
+}'''
+
+# Clicks the first element that opens the preview reader; returns which trigger matched, or null
+ACTIVATE_READER_JS = '''() => {
+    const triggers = [
+        ['img[src*="frontcover"]', null],  // Cover image
+        ['button', 'read'],
+        ['button', 'preview'],
+        ['a', 'read'],
+        ['a', 'preview'],
+        ['.gb-button', null],
+        ['[data-ved*="preview"]', null]
+    ];
+    for (const [selector, text] of triggers) {
+        const el = [...document.querySelectorAll(selector)].find(el =>
+            text === null || el.textContent.toLowerCase().includes(text)
+        );
+        if (el) {
+            el.click();
+            return text ? `${selector} "${text}"` : selector;
+        }
+    }
+    return null;
+}'''
+
+# Viewport crop holding the book content when the reader element can't be screenshotted
+CONTENT_CLIP = {'x': 200, 'y': 80, 'width': 1000, 'height': 1080}  # Maximum height to ensure no bottom cut-off
+
+# Google Books next-page controls, tried before falling back to the keyboard
+NEXT_PAGE_SELECTORS = [
+    'button[aria-label*="Next page"]',
+    'button[aria-label*="next"]',
+    '.gb-next',
+    '[title*="Next"]',
+    'button:has-text("Next")',
+    '[data-direction="next"]'
+]
+
+# Keyboard navigation (most reliable for Google Books), in order of preference
+NAVIGATION_KEYS = {
+    'Right Arrow': 'ArrowRight',
+    'Page Down': 'PageDown',
+    'Space': 'Space'
+}
+
+# True once nothing in the page is marked as loading and every image has finished decoding
+READER_IDLE_JS = """() => !document.querySelector('.loading, [aria-busy="true"]') &&
+    [...document.images].every(img => img.complete)"""
+
+async def wait_for_reader_idle(page, timeout: int):
+    """Wait until the reader has finished loading, giving up after timeout ms"""
+    # Give the reader a moment to start requesting the new page before checking
+    await page.wait_for_timeout(250)
+    try:
+        await page.wait_for_function(READER_IDLE_JS, timeout=timeout)
+    except PlaywrightTimeoutError:
+        logger.warning(f"⚠️ Reader still loading after {timeout}ms, continuing")
+
+# Google Books page container, used to crop fallback screenshots to the book itself
+BOOK_CONTENT_SELECTOR = 'div#viewport, .gb-reader-container'
+
+async def content_clip(page) -> dict:
+    """Visible bounding box of the book content, or CONTENT_CLIP when it can't be found"""
+    box = None
+    content = page.locator(BOOK_CONTENT_SELECTOR).first
+    if await content.count():
+        box = await content.bounding_box()
+    viewport = page.viewport_size
+    if not box or not viewport:
+        return CONTENT_CLIP
+    
+    # Clip to the part of the element inside the viewport
+    x, y = max(box['x'], 0), max(box['y'], 0)
+    width = min(box['x'] + box['width'], viewport['width']) - x
+    height = min(box['y'] + box['height'], viewport['height']) - y
+    if width <= 0 or height <= 0:
+        return CONTENT_CLIP
+    return {'x': x, 'y': y, 'width': width, 'height': height}
+
+# JPEG quality for page captures fed to OCR
+CAPTURE_JPEG_QUALITY = 90
+
+async def capture_page(page, viewer_element, page_num: int) -> bytes:
+    """Screenshot the current book page as high-quality JPEG bytes
+
+    JPEG encodes several times faster than PNG at this size, and at quality 90 the
+    artifacts are far below what affects OCR; saved pages are re-encoded as PNG.
+    """
+    if viewer_element:
+        try:
+            # Try to screenshot just the viewer element (zoomed out)
+            screenshot_bytes = await viewer_element.screenshot(
+                type='jpeg',
+                quality=CAPTURE_JPEG_QUALITY,
+                omit_background=False  # Include background for better contrast
+            )
+            logger.info(f"✅ Viewer screenshot captured: page {page_num}")
+            return screenshot_bytes
+        except Exception:
+            pass
+    
+    # Fallback: targeted crop for book content area
+    screenshot_bytes = await page.screenshot(
+        full_page=False,  # Viewport only
+        clip=await content_clip(page),
+        type='jpeg',
+        quality=CAPTURE_JPEG_QUALITY,
+        omit_background=False  # Include background for better contrast
+    )
+    logger.info(f"✅ Targeted screenshot captured: page {page_num}")
+    return screenshot_bytes
+
+async def go_to_next_page(page, use_reader_controls: bool, retry: int = 0) -> bool:
+    """Turn to the next page, returning whether any navigation method worked
+
+    On a retry, the methods that already failed to advance the reader are skipped.
+    """
+    keys = list(NAVIGATION_KEYS.items())
+    if use_reader_controls and retry:
+        keys = keys[retry - 1:]
+    elif retry:
+        keys = keys[retry:]
+    
+    if use_reader_controls and not retry:
+        for selector in NEXT_PAGE_SELECTORS:
+            next_buttons = await page.query_selector_all(selector)
+            if next_buttons:
+                try:
+                    await next_buttons[0].click()
+                    await wait_for_reader_idle(page, 3000)
+                    logger.info(f"✅ Navigated using: {selector}")
+                    return True
+                except Exception:
+                    continue
+    
+    for method_name, key in keys:
+        try:
+            logger.info(f"🔄 Trying {method_name} navigation...")
+            await page.keyboard.press(key)
+            await wait_for_reader_idle(page, 3000)
+            logger.info(f"✅ Navigated using {method_name}")
+            return True
+        except Exception:
+            continue
+    return False
+
+# Selectable text Google Books renders over some preview pages; null when the page has none
+DOM_TEXT_JS = """() => {
+    const layer = document.querySelector('.text-layer, .pageTextLayer');
+    return layer ? layer.innerText : null;
+}"""
+
+# Shorter DOM text is likely a stray caption rather than the page itself
+MIN_DOM_TEXT_LENGTH = 100
+
+async def page_dom_text(page) -> Optional[str]:
+    """Text of the current page straight from the reader's text layer, when it has enough of it"""
+    try:
+        text = await page.evaluate(DOM_TEXT_JS)
+    except Exception:
+        return None
+    if not text:
+        return None
+    text = clean_ocr_text(text).strip()
+    return text if len(text) > MIN_DOM_TEXT_LENGTH else None
+
+# Perceptual hashes closer than this are treated as the same page
+REPEAT_PAGE_DISTANCE = 4
+
+def perceptual_hash(image_bytes: bytes):
+    """Perceptual hash of a page screenshot, for spotting page turns that didn't advance"""
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        return imagehash.phash(image.resize((32, 32)))
+
+def is_repeat_page(page_hash, recent_hashes) -> bool:
+    return any(page_hash - seen < REPEAT_PAGE_DISTANCE for seen in recent_hashes)
+
+# Browser context closes still in flight after their extraction moved on
+_closing_contexts = set()
+
+def finish_context_close(task):
+    """Done-callback for a background context close: drop it and report any failure"""
+    _closing_contexts.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"⚠️ Could not close browser context: {task.exception()}")
 
 async def extract_google_books_pages(preview_url: str, book_title: str, book_author: str, max_pages: int = 18):
     """
@@ -200,73 +820,69 @@ async def extract_google_books_pages(preview_url: str, book_title: str, book_aut
     screenshots_dir = os.path.abspath("temp/screenshots")
     os.makedirs(screenshots_dir, exist_ok=True)
     
-    # Initialize list for parallel OCR tasks
-    ocr_tasks = []
+    # Captured page images kept in memory; only the selected page is written to disk
+    page_images = {}
+    # OCR jobs submitted to the process pool as pages are captured
+    ocr_futures = []
+    # Finished OCR results by page number, filled in as jobs complete in any order
+    completed_results = {}
+    # Pages whose text came from the reader's text layer instead of OCR
+    dom_pages = {}
+    analyzed_pages = 0
+    # GPT-4 early-stop check running alongside page capture
+    early_check = None
+    extraction_error = None
+    # Hashes of the last few captured pages, to catch navigation that didn't advance
+    recent_hashes = deque(maxlen=5)
+    # With a CUDA GPU, pages are recognized in EasyOCR batches instead of per-page tesseract jobs
+    easy_reader = await asyncio.get_running_loop().run_in_executor(_easyocr_executor, get_easy_reader)
     
-    print(f"PROGRESS:{json.dumps({'step_id': 'init', 'description': f'📂 Screenshots directory: {screenshots_dir}', 'status': 'completed'})}")
-    print(f"PROGRESS:{json.dumps({'step_id': 'setup', 'description': f'📖 Extracting pages from: {book_title} by {book_author}', 'status': 'running'})}")
-    print(f"PROGRESS:{json.dumps({'step_id': 'url', 'description': f'🔗 URL: {preview_url}', 'status': 'completed'})}")
+    emit_progress('init', f'📂 Screenshots directory: {screenshots_dir}', 'completed')
+    emit_progress('setup', f'📖 Extracting pages from: {book_title} by {book_author}')
+    emit_progress('url', f'🔗 URL: {preview_url}', 'completed')
     
-    async with async_playwright() as p:
-        # Launch browser in headless mode to avoid separate window
-        browser = await p.chromium.launch(headless=True)
+    async with acquire_browser() as browser:
         context = await browser.new_context(
             viewport={'width': 1400, 'height': 1180},  # Maximum viewport height for complete content capture
             device_scale_factor=2  # High DPI for better quality screenshots
         )
+        await context.route(BLOCKED_FONT_MEDIA_RE, abort_request)
+        await context.route(BLOCKED_TRACKER_RE, abort_request)
         page = await context.new_page()
         
         try:
-            print(f"PROGRESS:{json.dumps({'step_id': 'navigation', 'description': '🌐 Navigating to Google Books preview...', 'status': 'running'})}")
+            emit_progress('navigation', '🌐 Navigating to Google Books preview...')
+            # networkidle already means the page has finished loading, so no extra settle wait is needed
             await page.goto(preview_url, wait_until='networkidle')
             
-            # Wait for the page to load
-            await page.wait_for_timeout(5000)
-            
-            # Try to close any popups or accept cookies
+            # Try to close any popups or accept cookies, all in one round-trip to the page
             try:
-                close_buttons = await page.query_selector_all('button:has-text("No thanks"), button:has-text("Got it"), button:has-text("Accept"), [aria-label*="close"], .modal-close')
-                for button in close_buttons[:2]:  # Close first 2 popups max
-                    await button.click()
-                    await page.wait_for_timeout(1000)
+                if await page.evaluate(DISMISS_POPUPS_JS):
+                    await wait_for_reader_idle(page, 1000)
             except:
                 pass
             
             # Send screenshot after page loads
             await send_screenshot_update(page, 'navigation', '🌐 Google Books page loaded')
             
-            print(f"PROGRESS:{json.dumps({'step_id': 'navigation', 'description': '🌐 Navigation completed', 'status': 'completed'})}")
-            print(f"PROGRESS:{json.dumps({'step_id': 'detection', 'description': '📚 Starting Google Books reader...', 'status': 'running'})}")
+            emit_progress('navigation', '🌐 Navigation completed', 'completed')
+            emit_progress('detection', '📚 Starting Google Books reader...')
             
             # Try to activate the Google Books reader by clicking on preview elements
             try:
-                # Look for preview/read buttons or cover image to start the reader
-                preview_triggers = [
-                    'img[src*="frontcover"]',  # Cover image
-                    'button:has-text("Read")',
-                    'button:has-text("Preview")',
-                    'a:has-text("Read")',
-                    'a:has-text("Preview")',
-                    '.gb-button',
-                    '[data-ved*="preview"]'
-                ]
-                
-                reader_activated = False
-                for trigger in preview_triggers:
-                    elements = await page.query_selector_all(trigger)
-                    if elements:
-                        print(f"🖱️ Clicking to activate reader: {trigger}")
-                        await elements[0].click()
-                        await page.wait_for_timeout(3000)
-                        reader_activated = True
-                        break
-                
-                if reader_activated:
-                    print(f"PROGRESS:{json.dumps({'step_id': 'detection', 'description': '✅ Reader activated, waiting for content...', 'status': 'running'})}")
-                    await page.wait_for_timeout(3000)
+                # Find and click the first preview/read button or cover image inside the page
+                trigger = await page.evaluate(ACTIVATE_READER_JS)
+                if trigger:
+                    logger.info(f"🖱️ Clicked to activate reader: {trigger}")
+                    emit_progress('detection', '✅ Reader activated, waiting for content...')
+                    try:
+                        await page.wait_for_selector('#viewer, .gb-reader, canvas, iframe[src*="books.google"]', timeout=5000)
+                    except PlaywrightTimeoutError:
+                        logger.warning("⚠️ Reader did not appear within 5s")
+                    await wait_for_reader_idle(page, 3000)
                 
             except Exception as e:
-                print(f"⚠️ Could not activate reader: {e}")
+                logger.warning(f"⚠️ Could not activate reader: {e}")
             
             # Now try to find the actual book viewer area with better selectors
             reader_selectors = [
@@ -283,289 +899,152 @@ async def extract_google_books_pages(preview_url: str, book_title: str, book_aut
             for selector in reader_selectors:
                 elements = await page.query_selector_all(selector)
                 if elements:
-                    print(f"✅ Found reader element: {selector}")
+                    logger.info(f"✅ Found reader element: {selector}")
                     viewer_element = elements[0]
                     break
             
-            if not viewer_element:
-                print("❌ Could not find book reader. Using full page approach with better navigation.")
-                # Enhanced full page approach with better navigation
-                for page_num in range(1, max_pages + 1):
-                    print(f"PROGRESS:{json.dumps({'step_id': f'page_{page_num}', 'description': f'📄 Capturing page {page_num}...', 'status': 'running'})}")
-                    
-                    # Moderate zoom to fit content but maintain quality
-                    await page.evaluate("document.body.style.zoom = '0.65'")
-                    await page.wait_for_timeout(1000)  # Let zoom take effect
-                    
-                    # Scroll to ensure we capture the full content
-                    await page.evaluate("window.scrollTo(0, 0)")  # Start from top
-                    await page.wait_for_timeout(500)
-                    
-                    # Take targeted screenshot of just the book content area
-                    screenshot_path = os.path.join(screenshots_dir, f"page_{page_num}.png")
-                    await page.screenshot(
-                        path=screenshot_path, 
-                        full_page=False,  # Viewport only
-                        clip={'x': 200, 'y': 80, 'width': 1000, 'height': 1080},  # Maximum height to ensure no bottom cut-off
-                        type='png',  # Explicit PNG for lossless quality
-                        omit_background=False  # Include background for better contrast
-                    )
-                    
-                    # Start OCR processing immediately for this page
-                    ocr_task = asyncio.create_task(extract_text_from_image_async(screenshot_path))
-                    ocr_tasks.append(ocr_task)
-                    print(f"🔄 Started OCR for page {page_num} in parallel...")
-                    
-                    # Send screenshot update
-                    await send_screenshot_update(page, f'page_{page_num}', f'📄 Captured page {page_num}')
-
-                    # Early analysis: Check every 3 pages if we can stop extraction
-                    if page_num >= 3 and page_num % 3 == 0:
-                        print(f"🔍 Checking if we have enough content after {page_num} pages...")
-                        
-                        # Wait for current OCR tasks to complete (only the ones we've started)
-                        current_tasks = ocr_tasks[:page_num]  # Only tasks for pages extracted so far
-                        completed_ocr = await asyncio.gather(*current_tasks, return_exceptions=True)
-                        page_contents = []
-                        
-                        for i, result in enumerate(completed_ocr):
-                            if isinstance(result, dict):
-                                page_contents.append(result)
-                        
-                        page_contents.sort(key=lambda x: x['page_number'])
-                        
-                        if len(page_contents) >= 3:  # Need at least 3 pages to analyze
-                            early_analysis = await analyze_book_with_gpt4(page_contents)
-                            classification = early_analysis.get("classification", "unknown")
-                            content_pages = early_analysis.get("content_pages", [])
-                            
-                            # Check if we have the required page
-                            target_page = None
-                            if classification == "fiction" and len(content_pages) >= 2:
-                                target_page = content_pages[1]  # 2nd content page for fiction
-                            elif classification == "non-fiction" and len(content_pages) >= 1:
-                                target_page = content_pages[0]  # 1st content page for non-fiction
-                            
-                            if target_page and target_page <= page_num:
-                                print(f"🎯 Early stop: Found required page {target_page} for {classification}!")
-                                print(f"PROGRESS:{json.dumps({'step_id': 'early_stop', 'description': f'✅ Found target page {target_page} for {classification} - stopping extraction', 'status': 'completed'})}")
-                                break  # Stop extraction early
-                    
-                    # Enhanced page navigation
-                    if page_num < max_pages:
-                        navigation_success = False
-                        navigation_methods = [
-                            ('Right Arrow Key', lambda: page.keyboard.press('ArrowRight')),
-                            ('Page Down', lambda: page.keyboard.press('PageDown')),
-                            ('Space Key', lambda: page.keyboard.press('Space')),
-                        ]
-                        
-                        for method_name, method_func in navigation_methods:
-                            try:
-                                print(f"🔄 Trying navigation: {method_name}")
-                                await method_func()
-                                await page.wait_for_timeout(2000)
-                                navigation_success = True
-                                break
-                            except:
-                                continue
-                        
-                        if not navigation_success:
-                            print(f"⚠️ Navigation failed for page {page_num}")
-                    
-                await browser.close()
-                pages_extracted = max_pages  # Set pages_extracted for OCR phase
-                print(f"✅ Enhanced navigation completed: {pages_extracted} pages extracted")
-                # Continue to OCR analysis - don't return early
+            if viewer_element:
+                emit_progress('extraction', '🎯 Starting page extraction from viewer...')
+            else:
+                logger.error("❌ Could not find book reader. Using full page approach with better navigation.")
             
-            # Main extraction loop with viewer element found
-            print(f"PROGRESS:{json.dumps({'step_id': 'extraction', 'description': '🎯 Starting page extraction from viewer...', 'status': 'running'})}")
+            # Moderate zoom to fit content but maintain quality, starting from the top;
+            # both persist across page turns, so this only needs to happen once
+            await page.evaluate("document.body.style.zoom = '0.65'; window.scrollTo(0, 0)")
+            await wait_for_reader_idle(page, 1000)  # Let zoom take effect
             
             pages_extracted = 0
             for page_num in range(1, max_pages + 1):
                 try:
-                    print(f"PROGRESS:{json.dumps({'step_id': f'page_{page_num}', 'description': f'📄 Extracting page {page_num}...', 'status': 'running'})}")
-                    
-                    # Wait for content to load
-                    await page.wait_for_timeout(2000)
-                    
-                    # Take high-quality screenshot of the viewer area
-                    screenshot_path = os.path.join(screenshots_dir, f"page_{page_num}.png")
-                    
-                    # Moderate zoom to fit content but maintain quality
-                    await page.evaluate("document.body.style.zoom = '0.65'")
-                    await page.wait_for_timeout(1000)  # Let zoom take effect
+                    screenshot_bytes = await capture_page(page, viewer_element, page_num)
                     
-                    # Scroll to ensure we capture the full content
-                    await page.evaluate("window.scrollTo(0, 0)")  # Start from top
-                    await page.wait_for_timeout(500)
+                    # A page turn can silently fail, or the reader can bounce between two pages;
+                    # retry with the next navigation method rather than OCR the same page twice
+                    page_hash = await asyncio.to_thread(perceptual_hash, screenshot_bytes)
+                    retry = 1
+                    while is_repeat_page(page_hash, recent_hashes):
+                        logger.info(f"🔁 Page {page_num} repeats an earlier capture, trying another navigation method...")
+                        if not await go_to_next_page(page, use_reader_controls=viewer_element is not None, retry=retry):
+                            break
+                        retry += 1
+                        screenshot_bytes = await capture_page(page, viewer_element, page_num)
+                        page_hash = await asyncio.to_thread(perceptual_hash, screenshot_bytes)
+                    if is_repeat_page(page_hash, recent_hashes):
+                        logger.warning(f"⚠️ Reader is no longer advancing, stopping at {page_num - 1} pages")
+                        break
+                    recent_hashes.append(page_hash)
                     
-                    try:
-                        # Try to screenshot just the viewer element (now zoomed out)
-                        await viewer_element.screenshot(
-                            path=screenshot_path,
-                            type='png',  # Explicit PNG for lossless quality
-                            omit_background=False  # Include background for better contrast
-                        )
-                        print(f"✅ Viewer screenshot saved: page_{page_num}.png")
-                    except:
-                        # Fallback: targeted crop for book content area
-                        await page.screenshot(
-                            path=screenshot_path,
-                            full_page=False,  # Viewport only
-                            clip={'x': 200, 'y': 80, 'width': 1000, 'height': 1080},  # Maximum height to ensure no bottom cut-off
-                            type='png',  # Explicit PNG for lossless quality
-                            omit_background=False  # Include background for better contrast
-                        )
-                        print(f"✅ Targeted screenshot saved: page_{page_num}.png")
+                    page_images[page_num] = screenshot_bytes
+                    if SAVE_PAGE_SCREENSHOTS:
+                        await asyncio.to_thread(save_page_image, screenshots_dir, f"page_{page_num}.png", screenshot_bytes)
                     
-                    # Start OCR processing immediately for this page
-                    ocr_task = asyncio.create_task(extract_text_from_image_async(screenshot_path))
-                    ocr_tasks.append(ocr_task)
-                    print(f"🔄 Started OCR for page {page_num} in parallel...")
+                    dom_text = await page_dom_text(page)
+                    if dom_text:
+                        # The reader already exposes this page's text, so OCR is unnecessary
+                        dom_pages[page_num] = completed_results[page_num] = page_result(page_num, dom_text)
+                        logger.info(f"📝 Read page {page_num} text from the reader, skipping OCR")
+                    elif easy_reader is None:
+                        # Start OCR processing immediately for this page, straight from the captured bytes
+                        ocr_future = submit_ocr(screenshot_bytes, page_num)
+                        ocr_future.add_done_callback(functools.partial(record_ocr_result, completed_results))
+                        ocr_futures.append(ocr_future)
+                        logger.info(f"🔄 Started OCR for page {page_num} in parallel...")
+                    elif page_num % 3 == 0:
+                        # Batch the pages captured since the last batch for the early-stop check
+                        await recognize_pending_pages(easy_reader, page_images, completed_results)
                     
                     # Send screenshot update to UI
                     await send_screenshot_update(page, f'page_{page_num}', f'📄 Captured page {page_num}')
                     pages_extracted += 1
 
-                    # Early analysis: Check every 3 pages if we can stop extraction
-                    if page_num >= 3 and page_num % 3 == 0:
-                        print(f"🔍 Checking if we have enough content after {page_num} pages...")
-                        
-                        # Wait for current OCR tasks to complete (only the ones we've started)
-                        current_tasks = ocr_tasks[:page_num]  # Only tasks for pages extracted so far
-                        completed_ocr = await asyncio.gather(*current_tasks, return_exceptions=True)
-                        page_contents = []
+                    # Early analysis: pick up a finished GPT-4 check, or re-check as soon as more
+                    # leading pages have finished OCR
+                    target_page = None
+                    if early_check is not None and early_check.done():
+                        classification, target_page = early_stop_target(early_check.result())
+                        early_check = None
+                    ready_pages = leading_pages(completed_results)
+                    if target_page is None and early_check is None and len(ready_pages) >= 3 and len(ready_pages) > analyzed_pages:  # Need at least 3 pages to analyze
+                        analyzed_pages = len(ready_pages)
+                        logger.info(f"🔍 Checking if we have enough content after {analyzed_pages} OCR'd pages...")
                         
-                        for i, result in enumerate(completed_ocr):
-                            if isinstance(result, dict):
-                                page_contents.append(result)
-                        
-                        page_contents.sort(key=lambda x: x['page_number'])
-                        
-                        if len(page_contents) >= 3:  # Need at least 3 pages to analyze
-                            early_analysis = await analyze_book_with_gpt4(page_contents)
-                            classification = early_analysis.get("classification", "unknown")
-                            content_pages = early_analysis.get("content_pages", [])
-                            
-                            # Check if we have the required page
-                            target_page = None
-                            if classification == "fiction" and len(content_pages) >= 2:
-                                target_page = content_pages[1]  # 2nd content page for fiction
-                            elif classification == "non-fiction" and len(content_pages) >= 1:
-                                target_page = content_pages[0]  # 1st content page for non-fiction
-                            
-                            if target_page and target_page <= page_num:
-                                print(f"🎯 Early stop: Found required page {target_page} for {classification}!")
-                                print(f"PROGRESS:{json.dumps({'step_id': 'early_stop', 'description': f'✅ Found target page {target_page} for {classification} - stopping extraction', 'status': 'completed'})}")
-                                break  # Stop extraction early
+                        if all(p['content_hint'] is False for p in ready_pages):
+                            # Copyright, contents and similar pages only; GPT-4 can't find content in them yet.
+                            # Prose alone isn't enough to stop on, since forewords and introductions read as prose
+                            logger.info("📑 Only front matter so far, skipping the GPT-4 check")
+                        else:
+                            # Keep capturing while GPT-4 looks at the pages; the answer is checked after later captures
+                            early_check = asyncio.ensure_future(analyze_book_with_gpt4(ready_pages))
+                    
+                    if target_page and target_page <= analyzed_pages:
+                        logger.info(f"🎯 Early stop: Found required page {target_page} for {classification}!")
+                        emit_progress('early_stop', f'✅ Found target page {target_page} for {classification} - stopping extraction', 'completed')
+                        # Later pages are discarded, so drop OCR jobs that haven't finished
+                        for future in ocr_futures:
+                            future.cancel()
+                        break  # Stop extraction early
                     
-                    # Navigate to next page using better methods
+                    # Navigate to next page
                     if page_num < max_pages:
-                        print(f"➡️ Navigating to page {page_num + 1}...")
-                        
-                        navigation_success = False
-                        
-                        # Method 1: Try Google Books specific navigation
-                        next_selectors = [
-                            'button[aria-label*="Next page"]',
-                            'button[aria-label*="next"]',
-                            '.gb-next',
-                            '[title*="Next"]',
-                            'button:has-text("Next")',
-                            '[data-direction="next"]'
-                        ]
-                        
-                        for selector in next_selectors:
-                            next_buttons = await page.query_selector_all(selector)
-                            if next_buttons:
-                                try:
-                                    await next_buttons[0].click()
-                                    await page.wait_for_timeout(3000)  # Longer wait for page load
-                                    navigation_success = True
-                                    print(f"✅ Navigated using: {selector}")
-                                    break
-                                except:
-                                    continue
-                        
-                        # Method 2: Keyboard navigation (most reliable for Google Books)
-                        if not navigation_success:
-                            keyboard_methods = [
-                                ('Right Arrow', 'ArrowRight'),
-                                ('Page Down', 'PageDown'),
-                                ('Space', 'Space')
-                            ]
-                            
-                            for method_name, key in keyboard_methods:
-                                try:
-                                    print(f"🔄 Trying {method_name} navigation...")
-                                    await page.keyboard.press(key)
-                                    await page.wait_for_timeout(3000)
-                                    navigation_success = True
-                                    print(f"✅ Navigated using {method_name}")
-                                    break
-                                except:
-                                    continue
-                        
-                        if not navigation_success:
-                            print(f"⚠️ All navigation methods failed for page {page_num}")
+                        logger.info(f"➡️ Navigating to page {page_num + 1}...")
+                        if not await go_to_next_page(page, use_reader_controls=viewer_element is not None):
+                            logger.warning(f"⚠️ All navigation methods failed for page {page_num}")
                             
                 except Exception as e:
-                    print(f"❌ Error processing page {page_num}: {str(e)}")
+                    logger.error(f"❌ Error processing page {page_num}: {str(e)}")
                     continue
             
-            print(f"✅ Completed extraction of {pages_extracted} pages")
+            logger.info(f"✅ Completed extraction of {pages_extracted} pages")
             
         except Exception as e:
-            print(f"❌ Error during extraction: {str(e)}")
-            return {
-                "success": False,
-                "error": str(e),
-                "pages_extracted": 0
-            }
+            logger.error(f"❌ Error during extraction: {str(e)}")
+            extraction_error = str(e)
         
         finally:
-            await browser.close()
-    
-    # Check results
-    screenshot_files = [f for f in os.listdir(screenshots_dir) if f.startswith("page_") and f.endswith(".png")]
-    actual_pages = len(screenshot_files)
-    
-    # OCR Analysis Phase - Wait for any remaining OCR tasks
-    print(f"PROGRESS:{json.dumps({'step_id': 'ocr_start', 'description': '🔍 Finalizing OCR analysis of extracted pages...', 'status': 'running'})}")
-    
-    page_contents = []
+            if early_check is not None:
+                # The final analysis below covers every page, so an unfinished early check is moot
+                early_check.cancel()
+            # Tear the context down while the remaining OCR and GPT-4 analysis run;
+            # the pooled browser can open the next extraction's context meanwhile
+            context_closing = asyncio.ensure_future(context.close())
+            # The loop only holds tasks weakly; keep this one alive until it finishes
+            _closing_contexts.add(context_closing)
+            context_closing.add_done_callback(finish_context_close)
     
-    # Wait for all parallel OCR tasks to complete (including any that finished early)
-    print(f"PROGRESS:{json.dumps({'step_id': 'ocr_wait', 'description': f'⏳ Waiting for parallel OCR processing of {len(ocr_tasks)} pages...', 'status': 'running'})}")
+    if extraction_error is not None:
+        # Close failures are reported by finish_context_close, so waiting never raises here
+        await asyncio.wait({context_closing})
+        return {
+            "success": False,
+            "error": extraction_error,
+            "pages_extracted": 0
+        }
     
-    page_contents = []
-    if ocr_tasks:
-        # Gather all OCR results (some might already be completed from early analysis)
-        ocr_results = await asyncio.gather(*ocr_tasks, return_exceptions=True)
-        
-        # Process results and handle any exceptions
-        for i, result in enumerate(ocr_results):
-            if isinstance(result, Exception):
-                print(f"❌ OCR failed for task {i+1}: {result}")
-                continue
-            elif isinstance(result, dict):
-                page_contents.append(result)
-                page_num = result['page_number']
-                text_len = result['text_length']
-                print(f"✅ Page {page_num}: {text_len} chars (OCR completed)")
+    # Check results
+    actual_pages = len(page_images)
+    screenshot_files = [f"page_{page_num}.png" for page_num in sorted(page_images)] if SAVE_PAGE_SCREENSHOTS else []
     
-    # Sort pages by page number to ensure correct order
-    page_contents.sort(key=lambda x: x['page_number'])
+    # OCR Analysis Phase - Wait for any remaining OCR jobs
+    emit_progress('ocr_start', '🔍 Finalizing OCR analysis of extracted pages...')
+    if easy_reader is None:
+        emit_progress('ocr_wait', f'⏳ Waiting for parallel OCR processing of {len(ocr_futures)} pages...')
+        page_contents = await collect_ocr_results(ocr_futures)
+        page_contents = sorted(page_contents + list(dom_pages.values()), key=lambda x: x['page_number'])
+    else:
+        emit_progress('ocr_wait', '⏳ Running batched GPU OCR on remaining pages...')
+        await recognize_pending_pages(easy_reader, page_images, completed_results)
+        page_contents = sorted(completed_results.values(), key=lambda x: x['page_number'])
+    for result in page_contents:
+        logger.info(f"✅ Page {result['page_number']}: {result['text_length']} chars (OCR completed)")
     
-    print(f"PROGRESS:{json.dumps({'step_id': 'ocr_complete', 'description': f'✅ Parallel OCR analysis complete. Processed {len(page_contents)} pages.', 'status': 'completed'})}")
+    emit_progress('ocr_complete', f'✅ OCR analysis complete. Processed {len(page_contents)} pages.', 'completed')
     
     # GPT-4 Analysis Phase
     selected_page = None
     gpt4_result = {"classification": "unknown", "confidence": "low"}
     
     if page_contents:
-        print(f"PROGRESS:{json.dumps({'step_id': 'gpt4_start', 'description': '🤖 Analyzing all pages with GPT-4...', 'status': 'running'})}")
+        emit_progress('gpt4_start', '🤖 Analyzing all pages with GPT-4...')
         
         gpt4_result = await analyze_book_with_gpt4(page_contents)
         
@@ -574,19 +1053,25 @@ async def extract_google_books_pages(preview_url: str, book_title: str, book_aut
         selected_page_num = gpt4_result.get("selected_page", None)
         reasoning = gpt4_result.get("reasoning", "")
         
-        print(f"PROGRESS:{json.dumps({'step_id': 'gpt4_complete', 'description': f'✅ Book classified as: {classification}', 'status': 'completed'})}")
-        print(f"🤖 GPT-4 Analysis:")
-        print(f"   📚 Classification: {classification}")
-        print(f"   📄 Content pages: {content_pages}")
-        print(f"   🎯 Selected page: {selected_page_num}")
-        print(f"   💭 Reasoning: {reasoning}")
+        emit_progress('gpt4_complete', f'✅ Book classified as: {classification}', 'completed')
+        logger.info(f"🤖 GPT-4 Analysis:")
+        logger.info(f"   📚 Classification: {classification}")
+        logger.info(f"   📄 Content pages: {content_pages}")
+        logger.info(f"   🎯 Selected page: {selected_page_num}")
+        logger.info(f"   💭 Reasoning: {reasoning}")
         
         # Get the selected page details
-        if selected_page_num and 1 <= selected_page_num <= len(page_contents):
-            selected_page = page_contents[selected_page_num - 1]
-            print(f"📖 Selected page {selected_page_num} with {len(selected_page['text'])} characters")
+        # Look pages up by number, since pages after an early stop may be missing
+        selected_page = next((p for p in page_contents if p['page_number'] == selected_page_num), None)
+        if selected_page:
+            logger.info(f"📖 Selected page {selected_page_num} with {len(selected_page['text'])} characters")
+            
+            # The UI shows the selected page through /screenshot, so it is the one file that must exist
+            if not SAVE_PAGE_SCREENSHOTS:
+                await asyncio.to_thread(save_page_image, screenshots_dir, selected_page["filename"], page_images[selected_page["page_number"]])
+                screenshot_files.append(selected_page["filename"])
         else:
-            print("⚠️ GPT-4 did not select a valid page")
+            logger.warning("⚠️ GPT-4 did not select a valid page")
     
     result = {
         "success": True,
@@ -607,38 +1092,16 @@ async def extract_google_books_pages(preview_url: str, book_title: str, book_aut
         }
     }
     
-    # Output result for backend communication
-    print(f"RESULT:{json.dumps(result)}")
+    await asyncio.wait({context_closing})
     return result
 
-async def extract_text_from_image_async(image_path: str) -> dict:
-    """Extract text from image using OCR with noise filtering - async version"""
-    loop = asyncio.get_event_loop()
-    
-    def run_ocr():
-        try:
-            image = Image.open(image_path)
-            text = pytesseract.image_to_string(image)
-            cleaned_text = clean_ocr_text(text)
-            return cleaned_text.strip()
-        except Exception as e:
-            print(f"OCR error for {image_path}: {e}")
-            return ""
-    
-    # Run OCR in thread pool to avoid blocking
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        text = await loop.run_in_executor(executor, run_ocr)
-    
-    # Extract page number from filename
-    filename = os.path.basename(image_path)
-    page_num = int(filename.split('_')[1].split('.')[0])
-    
-    return {
-        "page_number": page_num,
-        "filename": filename,
-        "text": text,
-        "text_length": len(text)
-    }
+async def run(preview_url: str, book_title: str, book_author: str, progress_cb=None) -> dict:
+    """Run an extraction in the current event loop, reporting progress dicts to progress_cb"""
+    token = progress_callback.set(progress_cb)
+    try:
+        return await extract_google_books_pages(preview_url, book_title, book_author)
+    finally:
+        progress_callback.reset(token)
 
 async def main():
     """Main function for testing"""
@@ -646,18 +1109,27 @@ async def main():
         print("Usage: python playwright_book_extractor.py <preview_url> <book_title> <book_author>")
         sys.exit(1)
     
+    # Standalone runs have no backend log queue, so log plainly to stdout
+    logging.basicConfig(stream=sys.stdout, level=logging.INFO, format='%(message)s')
+    
     preview_url = sys.argv[1]
     book_title = sys.argv[2]
     book_author = sys.argv[3]
     
-    result = await extract_google_books_pages(preview_url, book_title, book_author)
+    try:
+        result = await extract_google_books_pages(preview_url, book_title, book_author)
+    finally:
+        await close_browser_pool()
+    
+    # Output result for backend communication
+    write_protocol_line(b'RESULT:', result)
     
     # Only print debug info when run directly (not when called by backend)
     # The backend looks for RESULT: line, so avoid extra output
     if not any('backend.py' in arg for arg in sys.argv):
         print("\n" + "="*50)
         print("EXTRACTION RESULT:")
-        print(json.dumps(result, indent=2))
+        print(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())
 
 if __name__ == "__main__":
     asyncio.run(main()) 
\ No newline at end of file
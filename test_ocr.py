@@ -6,27 +6,30 @@ Test script to verify OCR functionality
 import os
 import sys
 try:
-    import pytesseract
+    import tesserocr
     from PIL import Image
     import openai
     from dotenv import load_dotenv
     print("✅ All required libraries imported successfully!")
 except ImportError as e:
     print(f"❌ Import error: {e}")
-    print("Run: pip install pytesseract Pillow openai python-dotenv")
+    print("Run: pip install tesserocr Pillow openai python-dotenv")
     sys.exit(1)
 
 def test_tesseract():
     """Test if Tesseract OCR engine is properly installed"""
     try:
-        version = pytesseract.get_tesseract_version()
+        version = tesserocr.tesseract_version().splitlines()[0]
         print(f"✅ Tesseract OCR version: {version}")
+        # Opening an API loads the English traineddata, catching a missing tessdata install
+        with tesserocr.PyTessBaseAPI(lang='eng'):
+            pass
         return True
     except Exception as e:
         print(f"❌ Tesseract OCR error: {e}")
         print("Install Tesseract OCR:")
         print("  macOS: brew install tesseract")
-        print("  Linux: sudo apt install tesseract-ocr")
+        print("  Linux: sudo apt install tesseract-ocr libtesseract-dev libleptonica-dev")
         return False
 
 def test_openai():
@@ -51,7 +54,9 @@ def test_ocr_sample():
             sample_file = os.path.join(screenshots_dir, png_files[0])
             try:
                 image = Image.open(sample_file)
-                text = pytesseract.image_to_string(image)
+                with tesserocr.PyTessBaseAPI(lang='eng') as api:
+                    api.SetImage(image)
+                    text = api.GetUTF8Text()
                 print(f"✅ OCR test successful on {png_files[0]}")
                 print(f"📄 Extracted {len(text)} characters")
                 return True